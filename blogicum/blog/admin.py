@@ -21,6 +21,7 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category',
         'is_published',
+        'comment_count',
         'created_at'
     )
     list_editable = (
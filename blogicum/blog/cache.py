@@ -0,0 +1,30 @@
+import time
+
+from django.core.cache import cache
+
+POSTS_VERSION = 'posts'
+POST_CARDS_VERSION = 'post_cards'
+FEED_PAGES_VERSION = 'feed_pages'
+CATEGORIES_VERSION = 'categories'
+LOCATIONS_VERSION = 'locations'
+SEARCH_VERSION = 'search'
+
+
+def get_version(name):
+    """Текущая версия именованной группы кэшированных данных"""
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(name):
+    """Сделать устаревшими все ключи, построенные на версии группы"""
+    cache.set(f'version:{name}', time.time_ns(), timeout=None)
+
+
+def make_key(name, *parts):
+    return ':'.join(str(part) for part in (name, get_version(name), *parts))
@@ -0,0 +1,156 @@
+from hashlib import md5
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from blog.cache import POST_CARDS_VERSION, POSTS_VERSION, get_version
+from blog.models import Post, User
+from blog.relations import categories
+from constants import FEED_CACHE_TIMEOUT, FEED_ITEMS
+
+
+class PostFeed(Feed):
+    """Лента последних публикаций в RSS"""
+
+    title = 'Блогикум'
+    description = 'Новые публикации в Блогикуме'
+
+    def get_object(self, request, *args, **kwargs):
+        # Объект нужен и для ETag, и Feed.__call__: ищем его один раз.
+        if not hasattr(request, 'feed_object'):
+            request.feed_object = self.resolve_object(
+                request, *args, **kwargs
+            )
+        return request.feed_object
+
+    def resolve_object(self, request, *args, **kwargs):
+        return None
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.postpub.published_cached()
+
+    def items(self, obj):
+        return self.get_posts(obj).order()[:FEED_ITEMS]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.text
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.username
+
+    def item_categories(self, post):
+        return (post.category.title,) if post.category else ()
+
+    def __call__(self, request, *args, **kwargs):
+        # Проверка кэша клиента стоит одного запроса max(pub_date);
+        # правки публикаций меняют версии, входящие в ETag.
+        obj = self.get_object(request, *args, **kwargs)
+        newest = self.get_posts(obj).aggregate(
+            newest=Max('pub_date')
+        )['newest']
+        etag = quote_etag(md5(':'.join(map(str, (
+            request.path,
+            newest,
+            get_version(POSTS_VERSION),
+            get_version(POST_CARDS_VERSION),
+        ))).encode()).hexdigest())
+        last_modified = newest and int(newest.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = f'feed:{etag}'
+            cached = cache.get(key)
+            if cached is None:
+                response = super().__call__(request, *args, **kwargs)
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    FEED_CACHE_TIMEOUT
+                )
+            else:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CategoryPostFeed(PostFeed):
+    """Публикации категории в RSS"""
+
+    def resolve_object(self, request, category_slug):
+        category = categories.get_published_by_slug(category_slug)
+        if category is None:
+            raise Http404('Категория не найдена')
+        return category
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+    def get_posts(self, category):
+        return super().get_posts(category).filter(category=category)
+
+
+class AuthorPostFeed(PostFeed):
+    """Публикации автора в RSS"""
+
+    def resolve_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: @{author.username}'
+
+    def description(self, author):
+        return f'Публикации пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=(author.username,))
+
+    def get_posts(self, author):
+        return super().get_posts(author).filter(author=author)
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class AtomPostFeed(AtomFeedMixin, PostFeed):
+    """Лента последних публикаций в Atom"""
+
+
+class AtomCategoryPostFeed(AtomFeedMixin, CategoryPostFeed):
+    """Публикации категории в Atom"""
+
+
+class AtomAuthorPostFeed(AtomFeedMixin, AuthorPostFeed):
+    """Публикации автора в Atom"""
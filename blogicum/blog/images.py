@@ -0,0 +1,63 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+
+# Форматы уменьшенных копий: имя в image_variants -> формат Pillow.
+VARIANT_FORMATS = {'jpeg': 'JPEG', 'webp': 'WEBP'}
+
+
+def variant_widths(width):
+    """Ширины копий, не превышающие ширину оригинала"""
+    widths = [value for value in IMAGE_VARIANT_WIDTHS if value < width]
+    return widths or [width]
+
+
+def build_variants(image_field, prefix):
+    """Уменьшенные копии картинки в JPEG и WebP для srcset"""
+    with image_field.open('rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+    stem = PurePosixPath(image_field.name).stem
+    variants = {
+        'source': image_field.name,
+        'width': original.width,
+        'height': original.height,
+    }
+    for key, image_format in VARIANT_FORMATS.items():
+        variants[key] = []
+        for width in variant_widths(original.width):
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(
+                buffer, image_format,
+                quality=IMAGE_VARIANT_QUALITY, optimize=True
+            )
+            name = default_storage.save(
+                f'{prefix}/{stem}_{width}.{key}',
+                ContentFile(buffer.getvalue())
+            )
+            variants[key].append(
+                {'name': name, 'width': width, 'height': height}
+            )
+    return variants
+
+
+def delete_variants(variants):
+    for key in VARIANT_FORMATS:
+        for variant in variants.get(key, ()):
+            default_storage.delete(variant['name'])
+
+
+def srcset(variants, key):
+    return ', '.join(
+        f'{default_storage.url(variant["name"])} {variant["width"]}w'
+        for variant in variants.get(key, ())
+    )
@@ -0,0 +1,95 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from blog import views
+from blog.models import Category, Comment, Post, User
+from constants import COMMENT_CURSOR_ORDER, PAGE_NUMBER
+
+# Полный проход по таблице в планах SQLite и PostgreSQL.
+TABLE_SCAN = (
+    r'^(?:.*\s)?SCAN (?:TABLE )?{table}(?! USING)\b',
+    r'Seq Scan on {table}\b',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит план выполнения (EXPLAIN) запросов лент блога и проверяет, '
+        'что они используют индексы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plan',
+            action='store_true',
+            help='Печатать план выполнения каждого запроса целиком.'
+        )
+
+    def view_queryset(self, view_class, **kwargs):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view.get_queryset()
+
+    def get_querysets(self):
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.first()
+        post = Post.objects.first()
+        if not (category and author and post):
+            raise CommandError(
+                'Для построения планов нужны хотя бы одна категория, '
+                'пользователь и публикация.'
+            )
+        return (
+            (
+                'blog:index', Post._meta.db_table,
+                self.view_queryset(views.PostListView),
+            ),
+            (
+                'blog:category_posts', Post._meta.db_table,
+                self.view_queryset(
+                    views.CategoryListView, category_slug=category.slug
+                ),
+            ),
+            (
+                'blog:profile', Post._meta.db_table,
+                self.view_queryset(
+                    views.ProfileView, username=author.username
+                ),
+            ),
+            (
+                'blog:post_detail (comments)', Comment._meta.db_table,
+                post.comments.select_related('author').order_by(
+                    *COMMENT_CURSOR_ORDER
+                ),
+            ),
+        )
+
+    def handle(self, *args, **options):
+        missing = 0
+        for name, table, queryset in self.get_querysets():
+            plan = queryset[:PAGE_NUMBER].explain()
+            scans = [
+                line for line in plan.splitlines()
+                if any(
+                    re.search(pattern.format(table=table), line)
+                    for pattern in TABLE_SCAN
+                )
+            ]
+            if scans:
+                missing += 1
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: полный проход по {table}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: использует индекс'
+                ))
+            if scans or options['verbose_plan']:
+                self.stdout.write(plan)
+        if missing:
+            raise CommandError(f'Запросов без индекса: {missing}')
@@ -0,0 +1,144 @@
+import csv
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Subquery
+
+from blog.management.commands.import_posts import parse_date
+from blog.models import Category, Comment, Location, Post
+
+CSV_FIELDS = (
+    'type', 'id', 'slug', 'name', 'title', 'description', 'text', 'pub_date',
+    'author', 'category', 'location', 'is_published', 'image',
+    'comment_count', 'post', 'created_at',
+)
+
+
+def iter_records(posts, chunk_size, with_comments=True):
+    """Записи выгрузки в формате команды import_posts"""
+    for slug, title, description, is_published in (
+        Category.objects.values_list(
+            'slug', 'title', 'description', 'is_published'
+        ).iterator(chunk_size)
+    ):
+        yield {
+            'type': 'category', 'slug': slug, 'title': title,
+            'description': description, 'is_published': is_published,
+        }
+    for name, is_published in Location.objects.values_list(
+        'name', 'is_published'
+    ).iterator(chunk_size):
+        yield {'type': 'location', 'name': name, 'is_published': is_published}
+    for post in posts.order_by('pk').values(
+        'id', 'title', 'text', 'pub_date', 'created_at', 'is_published',
+        'image',
+        'comment_count', 'author__username', 'category__slug',
+        'location__name',
+    ).iterator(chunk_size):
+        yield {
+            'type': 'post',
+            'id': post['id'],
+            'title': post['title'],
+            'text': post['text'],
+            'pub_date': post['pub_date'].isoformat(),
+            'created_at': post['created_at'].isoformat(),
+            'author': post['author__username'],
+            'category': post['category__slug'],
+            'location': post['location__name'],
+            'is_published': post['is_published'],
+            'image': post['image'],
+            'comment_count': post['comment_count'],
+        }
+    if not with_comments:
+        return
+    comments = Comment.objects.filter(
+        post__in=Subquery(posts.values('pk'))
+    ).order_by('pk').values_list(
+        'id', 'post_id', 'author__username', 'text', 'created_at'
+    )
+    for comment_id, post_id, author, text, created_at in comments.iterator(
+        chunk_size
+    ):
+        yield {
+            'type': 'comment', 'id': comment_id, 'post': post_id,
+            'author': author, 'text': text,
+            'created_at': created_at.isoformat(),
+        }
+
+
+def write_jsonl(records, file):
+    for record in records:
+        file.write(json.dumps(record, ensure_ascii=False))
+        file.write('\n')
+
+
+def write_csv(records, file):
+    writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает категории, местоположения, публикации и '
+        'комментарии в JSON Lines или CSV'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', type=Path,
+            help='Файл выгрузки; по умолчанию стандартный вывод.'
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат выгрузки; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать выгрузку; включается и расширением .gz.'
+        )
+        parser.add_argument(
+            '--since', type=parse_date,
+            help='Публикации с этой даты включительно.'
+        )
+        parser.add_argument(
+            '--until', type=parse_date,
+            help='Публикации до этой даты.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Число строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--no-comments', action='store_true',
+            help='Не выгружать комментарии.'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        suffixes = output.suffixes if output else []
+        compress = options['gzip'] or '.gz' in suffixes
+        file_format = options['format'] or (
+            'csv' if '.csv' in suffixes else 'jsonl'
+        )
+        if compress and output is None:
+            raise CommandError('Для сжатой выгрузки укажите --output')
+
+        posts = Post.postpub.pub_date_between(
+            options['since'], options['until']
+        )
+        records = iter_records(
+            posts, options['chunk_size'], not options['no_comments']
+        )
+        writer = write_csv if file_format == 'csv' else write_jsonl
+        if output is None:
+            writer(records, sys.stdout)
+            return
+        opener = gzip.open if compress else open
+        with opener(output, 'wt', encoding='utf-8', newline='') as file:
+            writer(records, file)
+        self.stderr.write(self.style.SUCCESS(f'Выгрузка сохранена в {output}'))
@@ -0,0 +1,341 @@
+import csv
+import gzip
+import json
+import time
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.cache import (FEED_PAGES_VERSION, POST_CARDS_VERSION, POSTS_VERSION,
+                        bump_version)
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import search_index
+
+# Порядок сохранения: сначала то, на что ссылаются остальные записи.
+RECORD_TYPES = ('category', 'location', 'user', 'post', 'comment')
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+
+def parse_bool(value, default=True):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_date(value):
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def read_jsonl(file):
+    for line in file:
+        yield json.loads(line) if line.strip() else None
+
+
+def read_csv(file):
+    for row in csv.DictReader(file):
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует категории, местоположения, пользователей, публикации '
+        'и комментарии из JSON Lines или CSV пакетами через bulk_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию определяется по расширению. '
+                 'Файлы .gz распаковываются на лету.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число записей в одной транзакции.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с места, сохранённого в файле контрольной '
+                 'точки <path>.checkpoint.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден')
+        file_format = options['format'] or (
+            'csv' if '.csv' in path.suffixes else 'jsonl'
+        )
+        self.batch_size = options['batch_size']
+        self.checkpoint = path.with_name(path.name + '.checkpoint')
+        skip = 0
+        if options['resume'] and self.checkpoint.exists():
+            skip = int(self.checkpoint.read_text())
+            self.stdout.write(f'Пропуск уже загруженных записей: {skip}')
+
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.locations = dict(Location.objects.values_list('name', 'id'))
+        self.users = dict(User.objects.values_list('username', 'id'))
+        self.imported = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        self.reset_batch()
+
+        reader = read_csv if file_format == 'csv' else read_jsonl
+        position = 0
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8', newline='') as file:
+            for position, record in enumerate(reader(file), start=1):
+                if position <= skip or record is None:
+                    continue
+                self.add_record(record, position)
+                if self.batch_length == self.batch_size:
+                    self.flush(position)
+        self.flush(position)
+
+        # Явные id не сдвигают последовательности PostgreSQL.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [Category, Location, User, Post, Comment]):
+                cursor.execute(sql)
+        # bulk_create не отправляет сигналы, поэтому индекс, флаги
+        # видимости публикаций и статистику строим заново.
+        search_index.rebuild()
+        Post.postpub.refresh_visibility()
+        call_command('rebuild_stats', stdout=self.stdout)
+        for version in (POSTS_VERSION, POST_CARDS_VERSION, FEED_PAGES_VERSION):
+            bump_version(version)
+        self.checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано записей: {self.imported}, '
+            f'пропущено: {self.skipped}'
+        ))
+
+    @property
+    def savers(self):
+        return {
+            'category': self.save_categories,
+            'location': self.save_locations,
+            'user': self.save_users,
+            'post': self.save_posts,
+            'comment': self.save_comments,
+        }
+
+    def reset_batch(self):
+        self.batch = {record_type: [] for record_type in RECORD_TYPES}
+        self.batch_length = 0
+
+    def add_record(self, record, position):
+        record_type = record.pop('type', None)
+        if record_type not in self.batch:
+            raise CommandError(
+                f'Запись {position}: неизвестный тип {record_type!r}'
+            )
+        self.batch[record_type].append((position, record))
+        self.batch_length += 1
+
+    def warn(self, position, message):
+        self.skipped += 1
+        self.stderr.write(f'Запись {position} пропущена: {message}')
+
+    def flush(self, position):
+        if not self.batch_length:
+            return
+        with transaction.atomic():
+            for record_type in RECORD_TYPES:
+                records = self.batch[record_type]
+                if records:
+                    self.imported += self.savers[record_type](records)
+        self.checkpoint.write_text(str(position))
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'Обработано записей: {self.imported} '
+            f'({self.imported / max(elapsed, 1e-6):.0f} в секунду)'
+        )
+        self.reset_batch()
+
+    def skip_existing(self, model, records):
+        """Записи без уже загруженных id; повторы считаются пропущенными"""
+        ids = [record['id'] for _, record in records if record.get('id')]
+        existing = set(model.objects.filter(pk__in=ids).values_list(
+            'pk', flat=True
+        ))
+        fresh = []
+        for position, record in records:
+            if record.get('id') and int(record['id']) in existing:
+                self.skipped += 1
+            else:
+                fresh.append((position, record))
+        return fresh
+
+    def restore_created_at(self, model, objects):
+        # auto_now_add заменяет дату при вставке, поэтому переносим её
+        # отдельным запросом. Без явного id строку найти нельзя.
+        dated = []
+        for obj in objects:
+            if obj.pk is not None and obj.imported_created_at:
+                obj.created_at = obj.imported_created_at
+                dated.append(obj)
+        model.objects.bulk_update(
+            dated, ('created_at',), batch_size=self.batch_size
+        )
+
+    def save_categories(self, records):
+        slugs = {
+            record['slug']: record for _, record in records
+            if record['slug'] not in self.categories
+        }
+        created = Category.objects.bulk_create(
+            [
+                Category(
+                    slug=slug,
+                    title=record.get('title', slug),
+                    description=record.get('description', ''),
+                    is_published=parse_bool(record.get('is_published')),
+                )
+                for slug, record in slugs.items()
+            ],
+            batch_size=self.batch_size,
+        )
+        self.categories.update(Category.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', 'id'))
+        return len(created)
+
+    def save_locations(self, records):
+        names = {
+            record['name']: record for _, record in records
+            if record['name'] not in self.locations
+        }
+        created = Location.objects.bulk_create(
+            [
+                Location(
+                    name=name,
+                    is_published=parse_bool(record.get('is_published')),
+                )
+                for name, record in names.items()
+            ],
+            batch_size=self.batch_size,
+        )
+        self.locations.update(Location.objects.filter(
+            name__in=names
+        ).values_list('name', 'id'))
+        return len(created)
+
+    def ensure_users(self, usernames):
+        missing = {
+            username: User(username=username) for username in usernames
+            if username and username not in self.users
+        }
+        for user in missing.values():
+            user.set_unusable_password()
+        User.objects.bulk_create(missing.values(), batch_size=self.batch_size)
+        self.users.update(User.objects.filter(
+            username__in=missing
+        ).values_list('username', 'id'))
+
+    def save_users(self, records):
+        new_users = {}
+        for _, record in records:
+            if record['username'] in self.users:
+                continue
+            user = User(
+                username=record['username'],
+                email=record.get('email', ''),
+                first_name=record.get('first_name', ''),
+                last_name=record.get('last_name', ''),
+            )
+            user.set_unusable_password()
+            new_users[user.username] = user
+        User.objects.bulk_create(
+            new_users.values(), batch_size=self.batch_size
+        )
+        self.users.update(User.objects.filter(
+            username__in=new_users
+        ).values_list('username', 'id'))
+        return len(new_users)
+
+    def save_posts(self, records):
+        records = self.skip_existing(Post, records)
+        self.ensure_users(record.get('author') for _, record in records)
+        posts = []
+        for position, record in records:
+            category = record.get('category')
+            location = record.get('location')
+            if category and category not in self.categories:
+                self.warn(position, f'нет категории {category!r}')
+                continue
+            if location and location not in self.locations:
+                self.warn(position, f'нет местоположения {location!r}')
+                continue
+            try:
+                post = Post(
+                    id=record.get('id'),
+                    title=record['title'],
+                    text=record.get('text', ''),
+                    pub_date=parse_date(record['pub_date']),
+                    author_id=self.users[record['author']],
+                    category_id=self.categories.get(category),
+                    location_id=self.locations.get(location),
+                    image=record.get('image', ''),
+                    is_published=parse_bool(record.get('is_published')),
+                )
+                post.imported_created_at = record.get('created_at') and (
+                    parse_date(record['created_at'])
+                )
+            except (KeyError, ValueError) as error:
+                self.warn(position, f'некорректная публикация: {error}')
+                continue
+            posts.append(post)
+        Post.objects.bulk_create(
+            posts, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.restore_created_at(Post, posts)
+        return len(posts)
+
+    def save_comments(self, records):
+        records = self.skip_existing(Comment, records)
+        self.ensure_users(record.get('author') for _, record in records)
+        post_ids = set(Post.objects.filter(
+            pk__in=[record.get('post') for _, record in records]
+        ).values_list('id', flat=True))
+        comments = []
+        for position, record in records:
+            try:
+                post_id = int(record['post'])
+                if post_id not in post_ids:
+                    self.warn(position, f'нет публикации {post_id}')
+                    continue
+                comment = Comment(
+                    id=record.get('id'),
+                    post_id=post_id,
+                    author_id=self.users[record['author']],
+                    text=record['text'],
+                    # Об импортированной истории авторам не пишем.
+                    is_notified=True,
+                )
+                comment.imported_created_at = record.get('created_at') and (
+                    parse_date(record['created_at'])
+                )
+            except (KeyError, ValueError) as error:
+                self.warn(position, f'некорректный комментарий: {error}')
+                continue
+            comments.append(comment)
+        Comment.objects.bulk_create(
+            comments, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.restore_created_at(Comment, comments)
+        Post.postpub.filter(pk__in=post_ids).recount_comments()
+        return len(comments)
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.models import Post
+from blog.publication import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные публикации, время которых наступило, '
+        'и сбрасывает кэши лент'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval', type=float, default=60.0,
+            help='Наибольшая пауза в секундах между проверками.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Открыть наступившие публикации и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            close_old_connections()
+            published = publish_due_posts()
+            if published:
+                total += published
+                self.stdout.write(f'Открыто публикаций: {published}')
+            if options['once']:
+                break
+            # Просыпаемся к ближайшей публикации, но не реже poll-interval:
+            # её время могут изменить.
+            pause = options['poll_interval']
+            next_pub_date = Post.postpub.next_pub_date()
+            if next_pub_date is not None:
+                pause = min(
+                    pause,
+                    (next_pub_date - timezone.now()).total_seconds()
+                )
+            time.sleep(max(pause, 0.1))
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего открыто публикаций: {total}'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import search_index
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс публикаций'
+
+    def handle(self, *args, **options):
+        search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
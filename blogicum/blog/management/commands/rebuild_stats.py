@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, User
+from blog.stats import recount_author, recount_category
+
+
+class Command(BaseCommand):
+    help = 'Заново считает статистику авторов и категорий'
+
+    def handle(self, *args, **options):
+        authors = User.objects.values_list('id', flat=True)
+        for author_id in authors.iterator():
+            recount_author(author_id)
+        categories = Category.objects.values_list('id', flat=True)
+        for category_id in categories.iterator():
+            recount_category(category_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано авторов: {authors.count()}, '
+            f'категорий: {categories.count()}'
+        ))
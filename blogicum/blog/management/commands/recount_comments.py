@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import FEED_PAGES_VERSION, bump_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций'
+
+    def handle(self, *args, **options):
+        fixed = Post.postpub.get_queryset().recount_comments()
+        if fixed:
+            # Кэш страниц и ETag учитывают только версию лент.
+            bump_version(FEED_PAGES_VERSION)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {fixed}')
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.tasks import send_comment_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает авторам письма о новых комментариях к их публикациям'
+
+    def handle(self, *args, **options):
+        sent = send_comment_digests()
+        self.stdout.write(self.style.SUCCESS(f'Отправлено писем: {sent}'))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Пути и размеры копий; заполняются в фоне после загрузки.', verbose_name='Уменьшенные копии картинки'),
+        ),
+    ]
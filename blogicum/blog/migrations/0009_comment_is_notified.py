@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+def mark_existing_notified(apps, schema_editor):
+    # О комментариях, оставленных до появления рассылки, не уведомляем.
+    Comment = apps.get_model('blog', 'Comment')
+    Comment.objects.update(is_notified=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_notified',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Автор публикации уведомлён'),
+        ),
+        migrations.RunPython(mark_existing_notified, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_notified', False)), fields=['created_at', 'id'], name='comment_unnotified_idx'),
+        ),
+    ]
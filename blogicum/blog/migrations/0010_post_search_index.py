@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    # Полнотекстовый индекс есть только в SQLite со сборкой FTS5;
+    # в остальных случаях поиск использует обратный индекс в памяти.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        'INSERT INTO blog_post_fts (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_is_notified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0010_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('posts_published', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+                ('posts_scheduled', models.PositiveIntegerField(default=0, verbose_name='Отложено постов')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Получено комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('next_pub_date', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Ближайшая отложенная публикация')),
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user', verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('posts_published', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+                ('posts_scheduled', models.PositiveIntegerField(default=0, verbose_name='Отложено постов')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Получено комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('next_pub_date', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Ближайшая отложенная публикация')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+    ]
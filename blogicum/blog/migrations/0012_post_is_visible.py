@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:54
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_visible(apps, schema_editor):
+    # Уже вышедшие публикации открываем сразу, отложенные — планировщик.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lt=timezone.now()
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_author_category_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликована, в опубликованной категории, и время публикации наступило. Отложенные публикации открывает команда publish_scheduled.', verbose_name='Видна всем'),
+        ),
+        migrations.RunPython(set_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-pub_date', '-id'], name='post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-pub_date', '-id'], name='post_category_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def post_totals(posts, key):
+    scheduled = Q(is_published=True, is_visible=False) & (
+        Q(pub_date__gt=timezone.now()) | Q(category__is_published=True)
+    )
+    rows = posts.order_by().values(key).annotate(
+        posts_published=Count('pk', filter=Q(is_visible=True)),
+        posts_scheduled=Count('pk', filter=scheduled),
+        next_pub_date=Min('pub_date', filter=scheduled),
+        comments_received=Coalesce(Sum('comment_count'), 0),
+        last_post=Max('created_at'),
+    )
+    return {row.pop(key): row for row in rows}
+
+
+def last_comments(comments, key):
+    rows = comments.order_by().values(key).annotate(last=Max('created_at'))
+    return {row[key]: row['last'] for row in rows}
+
+
+def fill_stats(model, owner_ids, totals, comments):
+    rows = []
+    for pk in owner_ids:
+        row = totals.get(pk, {})
+        activity = [
+            date for date in (row.pop('last_post', None), comments.get(pk))
+            if date
+        ]
+        rows.append(model(pk=pk, **row, last_activity=max(
+            activity, default=None
+        )))
+    model.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+def backfill_stats(apps, schema_editor):
+    # Статистика читается без пересчёта, поэтому строки нужны заранее.
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    fill_stats(
+        apps.get_model('blog', 'AuthorStats'),
+        apps.get_model('auth', 'User').objects.values_list('id', flat=True),
+        post_totals(Post.objects.all(), 'author'),
+        last_comments(Comment.objects.all(), 'author'),
+    )
+    fill_stats(
+        apps.get_model('blog', 'CategoryStats'),
+        apps.get_model('blog', 'Category').objects.values_list(
+            'id', flat=True
+        ),
+        post_totals(Post.objects.exclude(category=None), 'category'),
+        last_comments(
+            Comment.objects.exclude(post__category=None), 'post__category'
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
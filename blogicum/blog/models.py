@@ -1,9 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 
+from blog.images import srcset
+from blog.relations import CachedRelationsIterable, categories
+from blog.search import search_index
 from constants import POST_ORDER, TITLE_MAX_LENGTH
 from core.models import PublCreateModel, PublPublishedModel
 
@@ -11,15 +16,85 @@ User = get_user_model()
 
 
 class PostQueryset(models.QuerySet):
+    def with_related(self):
+        return self.select_related('category', 'location', 'author')
+
     def published(self):
+        return self.filter(is_visible=True).with_related()
+
+    def with_cached_relations(self):
+        """Категории и местоположения из процессного кэша вместо JOIN"""
+        queryset = self.select_related(None).select_related('author')
+        queryset._iterable_class = CachedRelationsIterable
+        return queryset
+
+    def published_cached(self):
+        """То же, что published(), но без JOIN категорий и местоположений"""
+        return self.filter(is_visible=True).with_cached_relations()
+
+    def search(self, query):
+        """Публикации по словам из заголовка и текста, лучшие первыми"""
+        return search_index.search(self, query)
+
+    def pub_date_between(self, since=None, until=None):
+        queryset = self
+        if since is not None:
+            queryset = queryset.filter(pub_date__gte=since)
+        if until is not None:
+            queryset = queryset.filter(pub_date__lt=until)
+        return queryset
+
+    def next_pub_date(self):
+        """Время ближайшей публикации, которую ещё предстоит открыть"""
         return self.filter(
+            is_visible=False,
+            is_published=True,
+            category__in=categories.published_ids()
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+    def refresh_visibility(self):
+        """Пересчитать флаг is_visible.
+
+        Возвращает изменённые публикации кортежами (id, author_id,
+        category_id): update() не отправляет сигналов, и статистику их
+        авторов и категорий пересчитывает вызывающий код.
+        """
+        visible = Q(
             is_published=True,
             category__is_published=True,
             pub_date__lt=timezone.now()
-        ).select_related('category', 'location', 'author')
+        )
+        changed = []
+        for rows, is_visible in (
+                (self.filter(visible, is_visible=False), True),
+                (self.filter(is_visible=True).exclude(visible), False)):
+            posts = list(rows.values_list('id', 'author_id', 'category_id'))
+            if posts:
+                self.model.objects.filter(
+                    pk__in=[post_id for post_id, *_ in posts]
+                ).update(is_visible=is_visible)
+                changed.extend(posts)
+        return changed
 
     def count_comment(self):
-        return self.annotate(comment_count=Count('comments'))
+        # Число комментариев хранится в поле Post.comment_count.
+        return self
+
+    def recount_comments(self):
+        """Исправить сохранённое число комментариев, вернуть число правок"""
+        actual_count = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0
+        )
+        return self.annotate(actual_count=actual_count).exclude(
+            comment_count=F('actual_count')
+        ).update(comment_count=actual_count)
 
     def order(self):
         return self.order_by(POST_ORDER)
@@ -29,9 +104,30 @@ class PostPubManager(models.Manager):
     def get_queryset(self):
         return PostQueryset(self.model)
 
+    def with_related(self):
+        return self.get_queryset().with_related()
+
     def published(self):
         return self.get_queryset().published()
 
+    def with_cached_relations(self):
+        return self.get_queryset().with_cached_relations()
+
+    def published_cached(self):
+        return self.get_queryset().published_cached()
+
+    def pub_date_between(self, since=None, until=None):
+        return self.get_queryset().pub_date_between(since, until)
+
+    def next_pub_date(self):
+        return self.get_queryset().next_pub_date()
+
+    def refresh_visibility(self):
+        return self.get_queryset().refresh_visibility()
+
+    def search(self, query):
+        return self.get_queryset().search(query)
+
     def count_comment(self):
         return self.get_queryset().count_comment()
 
@@ -66,22 +162,114 @@ class Post(PublPublishedModel):
     )
 
     image = models.ImageField('Картинка в публикации', blank=True)
+    image_variants = models.JSONField(
+        'Уменьшенные копии картинки',
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Пути и размеры копий; заполняются в фоне после загрузки.'
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    is_visible = models.BooleanField(
+        'Видна всем',
+        default=False,
+        editable=False,
+        help_text='Опубликована, в опубликованной категории, и время '
+                  'публикации наступило. Отложенные публикации открывает '
+                  'команда publish_scheduled.'
+    )
 
     objects = models.Manager()
     postpub = PostPubManager()
 
+    # Поля, которые обновляются в обход формы.
+    background_fields = ('comment_count', 'image_variants')
+
     class Meta:
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев и уменьшенные копии изображения пишут
+        # F()-обновления и фоновые задачи, поэтому при сохранении формы
+        # их устаревшие значения не пишем.
+        if (self.pk is not None and not self._state.adding
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.background_fields
+            ]
+        self.is_visible = self.is_public
+        if kwargs.get('update_fields'):
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'is_visible'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Прежние автор и категория: при их смене пересчитывается
+        # статистика обоих.
+        post.loaded_stats_keys = (
+            post.__dict__.get('author_id'), post.__dict__.get('category_id')
+        )
+        return post
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', args=(self.pk,))
 
+    @property
+    def image_srcset(self):
+        return srcset(self.image_variants, 'jpeg')
+
+    @property
+    def image_webp_srcset(self):
+        return srcset(self.image_variants, 'webp')
+
+    @property
+    def image_preview_url(self):
+        """Самая маленькая копия картинки или оригинал, пока копий нет"""
+        variants = self.image_variants.get('jpeg')
+        if variants:
+            return default_storage.url(variants[0]['name'])
+        return self.image.url
+
+    @property
+    def is_public(self):
+        """Публикация видна всем, даже если флаг is_visible ещё не открыт"""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date < timezone.now()
+        )
+
 
 class Category(PublPublishedModel):
     title = models.CharField(
@@ -103,6 +291,13 @@ class Category(PublPublishedModel):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        category = super().from_db(db, field_names, values)
+        # При смене публикации категории пересчитывается статистика авторов.
+        category.loaded_is_published = category.__dict__.get('is_published')
+        return category
+
 
 class Location(PublPublishedModel):
     name = models.CharField(
@@ -132,12 +327,87 @@ class Comment(PublCreateModel):
         on_delete=models.CASCADE,
         verbose_name='Комментируемый пост',
     )
+    is_notified = models.BooleanField(
+        'Автор публикации уведомлён',
+        default=False,
+        editable=False
+    )
 
     class Meta:
         default_related_name = 'comments'
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+            models.Index(
+                fields=('created_at', 'id'),
+                condition=models.Q(is_notified=False),
+                name='comment_unnotified_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        comment = super().from_db(db, field_names, values)
+        # Прежняя публикация: при переносе комментария пересчитываются обе.
+        comment.loaded_post_id = comment.__dict__.get('post_id')
+        return comment
+
+
+class Stats(models.Model):
+    """Заранее посчитанные итоги по публикациям и комментариям"""
+
+    posts_published = models.PositiveIntegerField(
+        'Опубликовано постов', default=0
+    )
+    posts_scheduled = models.PositiveIntegerField(
+        'Отложено постов', default=0
+    )
+    comments_received = models.PositiveIntegerField(
+        'Получено комментариев', default=0
+    )
+    last_activity = models.DateTimeField(
+        'Последняя активность', null=True, blank=True
+    )
+    next_pub_date = models.DateTimeField(
+        'Ближайшая отложенная публикация', null=True, blank=True,
+        editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+
+class AuthorStats(Stats):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+
+class CategoryStats(Stats):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Категория'
+    )
+
+    class Meta:
+        verbose_name = 'статистика категории'
+        verbose_name_plural = 'Статистика категорий'
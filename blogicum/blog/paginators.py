@@ -0,0 +1,182 @@
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from blog.cache import POSTS_VERSION, make_key
+from constants import POST_COUNT_CACHE_TIMEOUT
+
+
+class CursorPage(Sequence):
+    """Страница, полученная по курсору"""
+
+    def __init__(self, object_list, paginator, next_position=None,
+                 previous_position=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._next_position = next_position
+        self._previous_position = previous_position
+
+    def __repr__(self):
+        return f'<CursorPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._next_position is not None
+
+    def has_previous(self):
+        return self._previous_position is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode_cursor(self._next_position)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode_cursor(
+                self._previous_position, reverse=True
+            )
+        return None
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей сортировки крайнего объекта страницы,
+    поэтому стоимость запроса не зависит от глубины страницы и не требует
+    COUNT(*). Последнее поле сортировки должно быть уникальным.
+    """
+
+    is_keyset = True
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        )
+
+    def encode_cursor(self, position, reverse=False):
+        data = json.dumps({'p': position, 'r': reverse})
+        return urlsafe_base64_encode(data.encode())
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(force_str(urlsafe_base64_decode(cursor)))
+            position, reverse = data['p'], bool(data['r'])
+            if len(position) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.queryset.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, position)
+            ]
+        except Exception:
+            raise InvalidPage('Некорректный курсор страницы')
+        return values, reverse
+
+    def get_position(self, obj):
+        return [
+            self.queryset.model._meta.get_field(name).value_to_string(obj)
+            for name, _ in self.ordering
+        ]
+
+    def _order_by(self, reverse):
+        return [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def _after(self, values, reverse):
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def page(self, cursor=None):
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._after(values, reverse))
+        object_list = list(
+            queryset.order_by(*self._order_by(reverse))[:self.per_page + 1]
+        )
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+        if not object_list:
+            return CursorPage(object_list, self)
+        first, last = object_list[0], object_list[-1]
+        has_next = has_more if not reverse else True
+        has_previous = bool(cursor) and (has_more if reverse else True)
+        return CursorPage(
+            object_list,
+            self,
+            next_position=self.get_position(last) if has_next else None,
+            previous_position=(
+                self.get_position(first) if has_previous else None
+            ),
+        )
+
+
+class CachedCountPage(Page):
+    """Страница с ограниченным набором номеров соседних страниц"""
+
+    @property
+    def page_range(self):
+        paginator = self.paginator
+        if paginator.page_range_cap is None:
+            return paginator.page_range
+        return paginator.get_elided_page_range(
+            self.number, on_each_side=paginator.page_range_cap, on_ends=1
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который кэширует COUNT(*) по сигнатуре выборки.
+
+    Сигнатура описывает выборку (лента, категория, автор); кэш
+    сбрасывается сменой версии при изменении публикаций и категорий.
+    """
+
+    def __init__(self, object_list, per_page, signature=None,
+                 page_range_cap=None, timeout=POST_COUNT_CACHE_TIMEOUT,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.signature = signature
+        self.page_range_cap = page_range_cap
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        if self.signature is None:
+            return super().count
+        key = make_key(POSTS_VERSION, 'count', *self.signature)
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, self.timeout)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return CachedCountPage(*args, **kwargs)
@@ -0,0 +1,61 @@
+from math import ceil
+
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.cache import POSTS_VERSION, make_key
+from blog.models import Post
+
+# Отправляется после открытия отложенных публикаций; posts — список
+# кортежей (id, author_id, category_id).
+posts_published = Signal()
+
+
+def publish_due_posts():
+    """Открыть отложенные публикации, время которых наступило"""
+    due = Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True,
+        pub_date__lt=timezone.now()
+    ).values_list('id', 'author_id', 'category_id')
+    posts = list(due)
+    if not posts:
+        return 0
+    # Условное обновление: событие об открытии получает один обработчик.
+    opened = Post.objects.filter(
+        pk__in=[post_id for post_id, *_ in posts], is_visible=False
+    ).update(is_visible=True)
+    if opened:
+        posts_published.send(sender=Post, posts=posts)
+    return opened
+
+
+def cached_next_pub_date():
+    """Время ближайшей отложенной публикации.
+
+    Хранится в кэше до смены версии публикаций, так что в обычном
+    случае к базе не обращаемся. Сами публикации открывают только
+    publish_scheduled и очередь задач: чтение ничего не пишет.
+    """
+    key = make_key(POSTS_VERSION, 'next_pub_date')
+    cached = cache.get(key)
+    if cached is None:
+        cached = (Post.postpub.next_pub_date(),)
+        cache.set(key, cached, None)
+    next_pub_date, = cached
+    return next_pub_date
+
+
+def publication_timeout(timeout):
+    """Срок кэширования ленты, не переживающий ближайшую публикацию"""
+    next_pub_date = cached_next_pub_date()
+    if next_pub_date is None:
+        return timeout
+    seconds = ceil((next_pub_date - timezone.now()).total_seconds())
+    # Время уже наступило: кэш сбросит смена версий, когда планировщик
+    # откроет публикацию, а до тех пор страница не меняется.
+    if seconds <= 0:
+        return timeout
+    return min(timeout, seconds)
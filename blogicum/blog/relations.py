@@ -0,0 +1,88 @@
+from threading import Lock
+
+from django.apps import apps
+from django.db.models.query import ModelIterable
+
+from blog.cache import CATEGORIES_VERSION, LOCATIONS_VERSION, get_version
+
+
+class RelationCache:
+    """Процессный кэш небольшой таблицы, сверяемый с общей версией.
+
+    Строки хранятся в памяти процесса; при изменении таблицы сигналы
+    меняют версию в общем кэше, и каждый процесс перечитывает таблицу
+    при следующем обращении.
+    """
+
+    def __init__(self, model_name, version_name):
+        self.model_name = model_name
+        self.version_name = version_name
+        self._version = None
+        self._by_id = {}
+        self._lock = Lock()
+
+    @property
+    def model(self):
+        return apps.get_model('blog', self.model_name)
+
+    def load(self):
+        """Все строки таблицы по id, перечитанные при смене версии"""
+        version = get_version(self.version_name)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    # Общий для процесса снимок читаем из основной базы,
+                    # а не с возможно отстающей реплики.
+                    rows = self.model.objects.using('default')
+                    self._by_id = {obj.pk: obj for obj in rows}
+                    self.index(self._by_id)
+                    self._version = version
+        return self._by_id
+
+    def index(self, by_id):
+        """Дополнительные словари по свежему снимку таблицы"""
+
+    def get(self, pk):
+        return self.load().get(pk)
+
+    def published_ids(self):
+        return [obj.pk for obj in self.load().values() if obj.is_published]
+
+
+class CategoryCache(RelationCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._by_slug = {}
+
+    def index(self, by_id):
+        self._by_slug = {
+            category.slug: category for category in by_id.values()
+        }
+
+    def get_published_by_slug(self, slug):
+        self.load()
+        category = self._by_slug.get(slug)
+        if category is not None and category.is_published:
+            return category
+        return None
+
+
+categories = CategoryCache('Category', CATEGORIES_VERSION)
+locations = RelationCache('Location', LOCATIONS_VERSION)
+
+CACHED_RELATIONS = {'category': categories, 'location': locations}
+
+
+class CachedRelationsIterable(ModelIterable):
+    """Объекты запроса с категорией и местоположением из кэша"""
+
+    def __iter__(self):
+        relations = [
+            (self.queryset.model._meta.get_field(name), cache.load())
+            for name, cache in CACHED_RELATIONS.items()
+        ]
+        for obj in super().__iter__():
+            for field, by_id in relations:
+                pk = getattr(obj, field.attname)
+                field.set_cached_value(obj, by_id.get(pk))
+            yield obj
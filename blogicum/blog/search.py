@@ -0,0 +1,274 @@
+import math
+import re
+from collections import defaultdict
+from threading import Lock
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from blog.cache import SEARCH_VERSION, bump_version, get_version, make_key
+from constants import (POST_CURSOR_ORDER, SEARCH_JOURNAL_LIMIT,
+                       SEARCH_JOURNAL_TIMEOUT, SEARCH_RESULTS_LIMIT,
+                       SEARCH_TEXT_WEIGHT, SEARCH_TITLE_WEIGHT)
+
+FTS_TABLE = 'blog_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [token.casefold() for token in TOKEN_RE.findall(text or '')]
+
+
+_fts_databases = {}
+
+
+def fts_available(connection):
+    """Есть ли в базе таблица FTS5, созданная миграцией"""
+    if connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _fts_databases:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = %s",
+                (FTS_TABLE,)
+            )
+            _fts_databases[key] = cursor.fetchone() is not None
+    return _fts_databases[key]
+
+
+class InvertedIndex:
+    """Обратный индекс публикаций в памяти процесса.
+
+    Используется, когда в базе нет FTS5. Процесс, изменивший публикацию,
+    обновляет свою копию сразу и записывает id публикации в общий журнал;
+    остальные процессы перечитывают из базы только публикации из журнала.
+    Целиком индекс перестраивается при смене версии или потере журнала.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._position = 0
+        self._postings = defaultdict(dict)
+        self._terms = defaultdict(dict)
+
+    def _add(self, post_id, title, text):
+        weights = defaultdict(float)
+        for token in tokenize(title):
+            weights[token] += SEARCH_TITLE_WEIGHT
+        for token in tokenize(text):
+            weights[token] += SEARCH_TEXT_WEIGHT
+        for token, weight in weights.items():
+            self._postings[token][post_id] = weight
+        self._terms[post_id] = weights
+
+    def _remove(self, post_id):
+        for token in self._terms.pop(post_id, ()):
+            self._postings[token].pop(post_id, None)
+            if not self._postings[token]:
+                del self._postings[token]
+
+    def _rows(self, post_ids=None):
+        rows = apps.get_model('blog', 'Post').objects.using('default')
+        if post_ids is not None:
+            rows = rows.filter(pk__in=post_ids)
+        return rows.values_list('id', 'title', 'text').iterator()
+
+    def _journal_position(self):
+        return cache.get(make_key(SEARCH_VERSION, 'journal'), 0)
+
+    def _journal_changes(self, position):
+        """Id изменённых публикаций или None, если журнал потерян"""
+        if not 0 <= position - self._position <= SEARCH_JOURNAL_LIMIT:
+            return None
+        keys = [
+            make_key(SEARCH_VERSION, 'journal', number)
+            for number in range(self._position + 1, position + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys):
+            return None
+        return set(changes.values())
+
+    def load(self):
+        version = get_version(SEARCH_VERSION)
+        position = self._journal_position()
+        if version == self._version and position == self._position:
+            return
+        with self._lock:
+            if version == self._version:
+                changes = self._journal_changes(position)
+                if changes is not None:
+                    # Общий снимок читаем из основной базы, а не с реплики.
+                    for post_id in changes:
+                        self._remove(post_id)
+                    for post_id, title, text in self._rows(changes):
+                        self._add(post_id, title, text)
+                    self._position = max(self._position, position)
+                    return
+            self._postings = defaultdict(dict)
+            self._terms = defaultdict(dict)
+            for post_id, title, text in self._rows():
+                self._add(post_id, title, text)
+            self._version = version
+            self._position = position
+
+    def record_change(self, post_id):
+        """Записать id публикации в общий журнал изменений"""
+        key = make_key(SEARCH_VERSION, 'journal')
+        while True:
+            cache.add(key, 0, None)
+            position = cache.incr(key)
+            # incr файлового кэша не атомарен: занятый номер берём заново.
+            if cache.add(
+                    make_key(SEARCH_VERSION, 'journal', position),
+                    post_id, SEARCH_JOURNAL_TIMEOUT):
+                return position
+
+    def update(self, post_id, title=None, text=None):
+        # Другие процессы читают изменение из базы, поэтому в журнал
+        # оно попадает только после фиксации транзакции.
+        transaction.on_commit(lambda: self.record_change(post_id))
+        if self._version is None:
+            return
+        with self._lock:
+            self._remove(post_id)
+            if title is not None:
+                self._add(post_id, title, text)
+
+    def search(self, tokens):
+        """Id публикаций со всеми словами запроса, по убыванию веса"""
+        self.load()
+        with self._lock:
+            return self._score(tokens)
+
+    def _score(self, tokens):
+        total = max(len(self._terms), 1)
+        scores = None
+        for position, token in enumerate(tokens):
+            # Последнее слово запроса может быть недописанным.
+            if position == len(tokens) - 1:
+                terms = [term for term in self._postings
+                         if term.startswith(token)]
+            else:
+                terms = [token] if token in self._postings else []
+            token_scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for post_id, weight in postings.items():
+                    token_scores[post_id] += weight * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    post_id: score + token_scores[post_id]
+                    for post_id, score in scores.items()
+                    if post_id in token_scores
+                }
+        return sorted(scores or {}, key=scores.get, reverse=True)
+
+
+class PostSearchIndex:
+    """Полнотекстовый поиск по заголовку и тексту публикаций"""
+
+    def __init__(self):
+        self.fallback = InvertedIndex()
+
+    def write_connection(self):
+        return connections[router.db_for_write(
+            apps.get_model('blog', 'Post')
+        )]
+
+    def index(self, post):
+        connection = self.write_connection()
+        if not fts_available(connection):
+            self.fallback.update(post.pk, post.title, post.text)
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,)
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                (post.pk, post.title, post.text)
+            )
+
+    def remove(self, post_id):
+        connection = self.write_connection()
+        if not fts_available(connection):
+            self.fallback.update(post_id)
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post_id,)
+            )
+
+    def rebuild(self):
+        """Заново проиндексировать все публикации"""
+        connection = self.write_connection()
+        if not fts_available(connection):
+            bump_version(SEARCH_VERSION)
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'SELECT id, title, text FROM blog_post'
+            )
+
+    def visible_ids(self, ranked, queryset):
+        """Первые SEARCH_RESULTS_LIMIT id из ranked, входящие в queryset"""
+        visible = []
+        for start in range(0, len(ranked), SEARCH_RESULTS_LIMIT):
+            chunk = ranked[start:start + SEARCH_RESULTS_LIMIT]
+            allowed = set(
+                queryset.filter(pk__in=chunk).values_list('pk', flat=True)
+            )
+            visible.extend(pk for pk in chunk if pk in allowed)
+            if len(visible) >= SEARCH_RESULTS_LIMIT:
+                break
+        return visible[:SEARCH_RESULTS_LIMIT]
+
+    def ranked_ids(self, tokens, queryset):
+        """Id найденных публикаций выборки по убыванию релевантности"""
+        connection = connections[queryset.db]
+        if not fts_available(connection):
+            return self.visible_ids(self.fallback.search(tokens), queryset)
+        # Слова в кавычках не разбираются как синтаксис FTS5;
+        # * ищет недописанные слова по префиксу.
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        # Выборку (видимость, категория, автор) применяем до LIMIT,
+        # иначе скрытые публикации вытесняют видимые.
+        ids_query = queryset.order_by().values('pk').query
+        ids_sql, ids_params = ids_query.get_compiler(queryset.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'AND rowid IN ({ids_sql}) '
+                f'ORDER BY bm25({FTS_TABLE}, %s, %s) LIMIT %s',
+                (match, *ids_params, SEARCH_TITLE_WEIGHT, SEARCH_TEXT_WEIGHT,
+                 SEARCH_RESULTS_LIMIT)
+            )
+            return [post_id for post_id, in cursor.fetchall()]
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        ranked = self.ranked_ids(tokens, queryset) if tokens else []
+        if not ranked:
+            return queryset.none()
+        return queryset.filter(pk__in=ranked).annotate(
+            search_rank=Case(
+                *(When(pk=pk, then=Value(position))
+                  for position, pk in enumerate(ranked)),
+                output_field=IntegerField()
+            )
+        ).order_by('search_rank', *POST_CURSOR_ORDER)
+
+
+search_index = PostSearchIndex()
@@ -0,0 +1,213 @@
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import (CATEGORIES_VERSION, FEED_PAGES_VERSION,
+                        LOCATIONS_VERSION, POST_CARDS_VERSION, POSTS_VERSION,
+                        bump_version)
+from blog.images import delete_variants
+from blog.models import (Category, CategoryStats, Comment, Location, Post,
+                         User)
+from blog.publication import posts_published, publish_due_posts
+from blog.search import search_index
+from blog.stats import (comment_added, comment_moved, comment_removed,
+                        recount_category_authors, recount_post,
+                        recount_posts, schedule_recount)
+from blog.tasks import process_post_image, send_comment_digests
+from constants import COMMENT_DIGEST_WINDOW
+from core.tasks import enqueue
+
+
+def is_login_update(update_fields):
+    # Вход пользователя обновляет только last_login - страницы не меняются.
+    return bool(update_fields) and set(update_fields) <= {'last_login'}
+
+
+@receiver(pre_save, sender=Post)
+def fill_raw_post(sender, instance, raw, **kwargs):
+    # loaddata сохраняет строки как есть: ни auto_now, ни Post.save не
+    # срабатывают.
+    if not raw:
+        return
+    if instance.updated_at is None:
+        instance.updated_at = instance.created_at or timezone.now()
+    instance.is_visible = instance.is_public
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts(sender, instance, **kwargs):
+    # Флаг публикаций меняем раньше, чем сбрасываются кэши лент.
+    recount_posts(Post.postpub.filter(category=instance).refresh_visibility())
+
+
+@receiver(post_delete, sender=Category)
+def hide_uncategorized_posts(sender, **kwargs):
+    # Публикации удалённой категории остаются без категории.
+    recount_posts(Post.postpub.filter(category=None).refresh_visibility())
+
+
+@receiver(posts_published)
+def invalidate_published(sender, posts, **kwargs):
+    for version in (POSTS_VERSION, FEED_PAGES_VERSION):
+        bump_version(version)
+    recount_posts(posts)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(sender, **kwargs):
+    bump_version(POSTS_VERSION)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_version(CATEGORIES_VERSION)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_locations(sender, **kwargs):
+    bump_version(LOCATIONS_VERSION)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_save, sender=Comment)
+def schedule_comment_digest(sender, created, **kwargs):
+    # Одна рассылка на окно: пока задача ждёт, новые не добавляются.
+    if created:
+        enqueue(
+            send_comment_digests,
+            dedup_key='comment_digest',
+            delay=COMMENT_DIGEST_WINDOW
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_post_cards(sender, update_fields=None, **kwargs):
+    if not is_login_update(update_fields):
+        bump_version(POST_CARDS_VERSION)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_feed_pages(sender, update_fields=None, **kwargs):
+    if not is_login_update(update_fields):
+        bump_version(FEED_PAGES_VERSION)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, **kwargs):
+    image_name = instance.image.name or ''
+    if instance.image_variants.get('source', '') == image_name:
+        return
+    enqueue(
+        process_post_image, instance.pk,
+        dedup_key=f'post_image:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Post)
+def schedule_publication(sender, instance, **kwargs):
+    # Отложенную публикацию открывает задача ко времени её выхода;
+    # publish_scheduled подстрахует, если время потом перенесут.
+    delay = (instance.pub_date - timezone.now()).total_seconds()
+    if instance.is_visible or not instance.is_published or delay <= 0:
+        return
+    enqueue(
+        publish_due_posts,
+        dedup_key=f'publish_posts:{instance.pub_date.isoformat()}',
+        delay=delay
+    )
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    search_index.index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_post_stats(sender, instance, **kwargs):
+    recount_post(
+        instance, getattr(instance, 'loaded_stats_keys', (None, None))
+    )
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_stats(sender, instance, created, **kwargs):
+    if created:
+        comment_added(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_stats(sender, instance, **kwargs):
+    comment_removed(instance)
+
+
+@receiver(post_save, sender=Comment)
+def move_comment(sender, instance, created, **kwargs):
+    previous_post_id = getattr(instance, 'loaded_post_id', None)
+    if not created and previous_post_id not in (None, instance.post_id):
+        comment_moved(instance, previous_post_id)
+    instance.loaded_post_id = instance.post_id
+
+
+@receiver(post_save, sender=Category)
+def update_category_stats(sender, instance, created, **kwargs):
+    if created:
+        return
+    schedule_recount(CategoryStats, instance.pk)
+    if instance.is_published != getattr(
+            instance, 'loaded_is_published', None):
+        recount_category_authors(instance.pk)
+    instance.loaded_is_published = instance.is_published
+
+
+@receiver(pre_delete, sender=Category)
+def remove_category_stats(sender, instance, **kwargs):
+    # После удаления посты останутся без категории: авторов ищем заранее.
+    recount_category_authors(instance.pk)
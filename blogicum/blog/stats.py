@@ -0,0 +1,167 @@
+from math import ceil
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from blog.models import AuthorStats, CategoryStats, Comment, Post
+
+
+def stats_cache_key(model, pk):
+    return f'stats:{model._meta.model_name}:{pk}'
+
+
+def post_totals(posts):
+    """Итоги по публикациям; выполняется только при записи"""
+    # Опубликованные считаем по флагу, как ленты; наступившие, но ещё не
+    # открытые планировщиком, остаются отложенными.
+    scheduled = Q(is_published=True, is_visible=False) & (
+        Q(pub_date__gt=timezone.now()) | Q(category__is_published=True)
+    )
+    return posts.aggregate(
+        posts_published=Count('pk', filter=Q(is_visible=True)),
+        posts_scheduled=Count('pk', filter=scheduled),
+        next_pub_date=Min('pub_date', filter=scheduled),
+        comments_received=Coalesce(Sum('comment_count'), 0),
+        last_post=Max('created_at'),
+    )
+
+
+def save_stats(model, pk, totals, last_comment):
+    # Автора или категорию могли удалить вместе с их статистикой.
+    if not model._meta.pk.related_model.objects.filter(pk=pk).exists():
+        return
+    last_post = totals.pop('last_post')
+    activity = [date for date in (last_post, last_comment) if date]
+    model.objects.update_or_create(pk=pk, defaults=dict(
+        **totals, last_activity=max(activity, default=None)
+    ))
+    cache.delete(stats_cache_key(model, pk))
+
+
+def recount_author(author_id):
+    """Пересчитать статистику автора по его публикациям и комментариям"""
+    save_stats(
+        AuthorStats, author_id,
+        post_totals(Post.objects.filter(author_id=author_id)),
+        Comment.objects.filter(author_id=author_id).aggregate(
+            last=Max('created_at')
+        )['last']
+    )
+
+
+def recount_category(category_id):
+    """Пересчитать статистику категории"""
+    save_stats(
+        CategoryStats, category_id,
+        post_totals(Post.objects.filter(category_id=category_id)),
+        Comment.objects.filter(post__category_id=category_id).aggregate(
+            last=Max('created_at')
+        )['last']
+    )
+
+
+RECOUNTS = {AuthorStats: recount_author, CategoryStats: recount_category}
+
+
+def schedule_recount(model, pk):
+    """Пересчитать строку статистики после фиксации транзакции"""
+    if pk is not None:
+        transaction.on_commit(lambda: RECOUNTS[model](pk))
+
+
+def recount_category_authors(category_id):
+    """Пересчитать статистику авторов публикаций категории"""
+    # Число опубликованных постов автора зависит от публикации категории.
+    authors = Post.objects.filter(category_id=category_id).order_by()
+    for author_id in authors.values_list('author_id', flat=True).distinct():
+        schedule_recount(AuthorStats, author_id)
+
+
+def recount_post(post, previous=(None, None)):
+    """Статистика автора и категории публикации, прежних и новых"""
+    for author_id in {post.author_id, previous[0]}:
+        schedule_recount(AuthorStats, author_id)
+    for category_id in {post.category_id, previous[1]}:
+        schedule_recount(CategoryStats, category_id)
+
+
+def recount_posts(posts):
+    """Статистика авторов и категорий публикаций, изменённых без сигналов"""
+    for author_id in {author_id for _, author_id, _ in posts}:
+        schedule_recount(AuthorStats, author_id)
+    for category_id in {category_id for *_, category_id in posts}:
+        schedule_recount(CategoryStats, category_id)
+
+
+def shift_stats(model, pk, delta, activity=None):
+    """Изменить число комментариев без пересчёта"""
+    if pk is None:
+        return
+    changes = {'comments_received': F('comments_received') + delta}
+    if activity is not None:
+        changes['last_activity'] = Coalesce(
+            Greatest('last_activity', activity), activity
+        )
+    rows = model.objects.filter(pk=pk)
+    if delta < 0:
+        rows = rows.filter(comments_received__gte=-delta)
+    if not rows.update(**changes):
+        schedule_recount(model, pk)
+    cache.delete(stats_cache_key(model, pk))
+
+
+def touch_author(author_id, activity):
+    if not AuthorStats.objects.filter(pk=author_id).update(
+            last_activity=activity):
+        schedule_recount(AuthorStats, author_id)
+    cache.delete(stats_cache_key(AuthorStats, author_id))
+
+
+def comment_added(comment):
+    post = comment.post
+    shift_stats(AuthorStats, post.author_id, 1)
+    shift_stats(CategoryStats, post.category_id, 1, comment.created_at)
+    touch_author(comment.author_id, comment.created_at)
+
+
+def comment_removed(comment):
+    post = Post.objects.filter(pk=comment.post_id).values(
+        'author_id', 'category_id'
+    ).first()
+    # При каскадном удалении публикации её статистика пересчитается целиком.
+    if post is not None:
+        shift_stats(AuthorStats, post['author_id'], -1)
+        shift_stats(CategoryStats, post['category_id'], -1)
+
+
+def comment_moved(comment, previous_post_id):
+    """Пересчитать комментарии и статистику прежней и новой публикаций"""
+    posts = Post.postpub.filter(pk__in=(previous_post_id, comment.post_id))
+    posts.recount_comments()
+    for author_id, category_id in posts.values_list(
+            'author_id', 'category_id'):
+        schedule_recount(AuthorStats, author_id)
+        schedule_recount(CategoryStats, category_id)
+
+
+def cache_timeout(stats):
+    # Отложенная публикация выйдет: планировщик пересчитает строку,
+    # и к этому времени берём её из базы заново.
+    if stats.next_pub_date is None or stats.next_pub_date <= timezone.now():
+        return None
+    return ceil((stats.next_pub_date - timezone.now()).total_seconds())
+
+
+def get_stats(model, pk):
+    """Статистика автора или категории; чтение ничего не пересчитывает"""
+    key = stats_cache_key(model, pk)
+    stats = cache.get(key)
+    if stats is None:
+        # Строки заполняют миграция и пересчёты при записи; до первого
+        # пересчёта итоги нулевые.
+        stats = model.objects.filter(pk=pk).first() or model(pk=pk)
+        cache.set(key, stats, cache_timeout(stats))
+    return stats
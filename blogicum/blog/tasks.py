@@ -0,0 +1,90 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.cache import FEED_PAGES_VERSION, bump_version
+from blog.images import build_variants, delete_variants
+from blog.models import Comment, Post
+from constants import COMMENT_DIGEST_BATCH
+
+
+def process_post_image(post_id):
+    """Уменьшенные копии картинки публикации"""
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'image', 'image_variants'
+    ).first()
+    if post is None:
+        return
+    image_name = post.image.name or ''
+    if post.image_variants.get('source', '') == image_name:
+        return
+    old_variants = post.image_variants
+    variants = (
+        build_variants(post.image, f'variants/{post.pk}')
+        if post.image else {}
+    )
+    # Картинку могли заменить, пока готовились копии.
+    updated = Post.objects.filter(pk=post_id, image=image_name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    delete_variants(old_variants if updated else variants)
+    if updated:
+        bump_version(FEED_PAGES_VERSION)
+
+
+def build_comment_digests(comments):
+    """Одно письмо каждому автору со всеми новыми комментариями к его постам"""
+    for author, author_comments in groupby(
+            comments, key=lambda comment: comment.post.author):
+        author_comments = [
+            comment for comment in author_comments
+            if comment.author_id != author.pk
+        ]
+        if not author.email or not author_comments:
+            continue
+        posts = [
+            (post, list(post_comments))
+            for post, post_comments in groupby(
+                author_comments, key=lambda comment: comment.post
+            )
+        ]
+        yield EmailMessage(
+            subject='Новые комментарии к вашим публикациям',
+            body=render_to_string(
+                'emails/comment_digest.txt',
+                {
+                    'author': author,
+                    'posts': posts,
+                    'site_url': settings.SITE_URL.rstrip('/'),
+                }
+            ),
+            to=[author.email],
+        )
+
+
+def send_comment_digests():
+    """Разослать накопившиеся уведомления о комментариях"""
+    pending = (
+        Comment.objects.filter(is_notified=False)
+        .select_related('author', 'post__author')
+        .order_by('post__author', 'post', 'created_at', 'id')
+    )
+    sent = 0
+    # Одно открытое соединение с почтовым сервером на всю рассылку.
+    # Порциями: отмеченные комментарии в следующую выборку не попадут.
+    # Автор, чьи комментарии пришлись на границу порций, получит два
+    # письма.
+    with get_connection() as connection:
+        while True:
+            comments = list(pending[:COMMENT_DIGEST_BATCH])
+            if not comments:
+                return sent
+            messages = list(build_comment_digests(comments))
+            if messages:
+                sent += connection.send_messages(messages) or 0
+            Comment.objects.filter(
+                pk__in=[comment.pk for comment in comments]
+            ).update(is_notified=True)
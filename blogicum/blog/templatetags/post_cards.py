@@ -0,0 +1,25 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import POST_CARDS_VERSION, make_key
+from constants import POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации из кэша фрагментов"""
+    key = make_key(
+        POST_CARDS_VERSION,
+        post.pk,
+        post.updated_at.timestamp(),
+        post.comment_count,
+    )
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -1,15 +1,19 @@
 from django.urls import include, path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
 urls = [
-    path('', views.PostDetailView.as_view(), name='post_detail'),
+    path('', views.AsyncPostDetailView.as_view(), name='post_detail'),
     path('create/', views.PostCreateView.as_view(), name='create_post'),
     path('edit/', views.PostUpdateView.as_view(), name='edit_post'),
     path('delete/', views.PostDeleteView.as_view(), name='delete_post'),
     path('comment/', views.CommentCreateView.as_view(), name='add_comment'),
+    path(
+        'comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'),
     path(
         'edit_comment/<int:comment_id>/',
         views.CommentUpdateView.as_view(),
@@ -27,14 +31,31 @@ posts_urls = [
 
 profile_urls = [
     path('edit/', views.UserEditView.as_view(), name='edit_profile'),
-    path('<slug:username>/', views.ProfileView.as_view(), name='profile'),
+    path('<slug:username>/rss/', feeds.AuthorPostFeed(), name='profile_rss'),
+    path(
+        '<slug:username>/atom/',
+        feeds.AtomAuthorPostFeed(),
+        name='profile_atom'),
+    path(
+        '<slug:username>/',
+        views.AsyncProfileView.as_view(),
+        name='profile'),
 ]
 
 urlpatterns = [
-    path('', views.PostListView.as_view(), name='index'),
+    path('', views.AsyncPostListView.as_view(), name='index'),
     path('posts/', include(posts_urls)),
     path('category/<slug:category_slug>/',
-         views.CategoryListView.as_view(),
+         views.AsyncCategoryListView.as_view(),
          name='category_posts'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.CategoryPostFeed(),
+         name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.AtomCategoryPostFeed(),
+         name='category_atom'),
+    path('rss/', feeds.PostFeed(), name='rss'),
+    path('atom/', feeds.AtomPostFeed(), name='atom'),
     path('profile/', include(profile_urls)),
+    path('search/', views.PostSearchView.as_view(), name='search'),
 ]
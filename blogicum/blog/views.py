@@ -1,13 +1,32 @@
+from hashlib import md5
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import quote_etag
 from django.views.generic import (CreateView, DeleteView, DetailView,
                                   ListView, UpdateView)
 
+from blog.cache import FEED_PAGES_VERSION, get_version, make_key
 from blog.forms import CommentForm, PostForm
-from blog.models import Category, Comment, Post, User
-from constants import PAGE_NUMBER
-from core.utils import get_published_objects
+from blog.models import AuthorStats, CategoryStats, Comment, Post, User
+from blog.paginators import CachedCountPaginator, KeysetPaginator
+from blog.publication import publication_timeout
+from blog.relations import categories
+from blog.stats import get_stats
+from constants import (COMMENT_CURSOR_ORDER, COMMENTS_PER_PAGE,
+                       FEED_PAGE_CACHE_TIMEOUT, PAGE_NUMBER, PAGE_RANGE_CAP,
+                       POST_COUNT_CACHE_TIMEOUT, POST_CURSOR_ORDER)
+from core.aio import AsyncViewMixin
+from core.routers import ReadReplicaMixin
 
 
 class TestAuthorMixin(UserPassesTestMixin):
@@ -21,7 +40,119 @@ class TestAuthorMixin(UserPassesTestMixin):
         )
 
 
-class PostListView(ListView):
+class CursorPaginationMixin:
+    """Постраничный вывод ленты по курсору вместо номера страницы"""
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = POST_CURSOR_ORDER
+
+    def use_cursor_pagination(self):
+        return (
+            settings.CURSOR_PAGINATION
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Кэширование страниц ленты целиком для анонимных пользователей"""
+
+    page_cache_timeout = FEED_PAGE_CACHE_TIMEOUT
+    # Параметры запроса, от которых зависит страница; с любыми другими
+    # страница не кэшируется, чтобы ими нельзя было засорить кэш.
+    page_cache_params = ('page', 'cursor')
+
+    def get_page_cache_key(self, request):
+        if set(request.GET) - set(self.page_cache_params):
+            return None
+        params = urlencode(sorted(request.GET.lists()), doseq=True)
+        return make_key(
+            FEED_PAGES_VERSION,
+            md5(f'{request.path}?{params}'.encode()).hexdigest()
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key(request)
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered,
+                    publication_timeout(self.page_cache_timeout)
+                )
+            )
+        return response
+
+
+class ConditionalResponseMixin:
+    """Ответ 304 без выборки страницы, если копия клиента не устарела"""
+
+    def get_validators(self):
+        # Версия меняется при любой правке публикаций, комментариев,
+        # категорий, местоположений и пользователей.
+        return (get_version(FEED_PAGES_VERSION),)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = quote_etag(md5(':'.join(map(str, (
+            request.get_full_path(),
+            request.user.pk,
+            # В формах страницы выводится CSRF-токен: копия со старым
+            # токеном после его смены не подходит.
+            request.META.get('CSRF_COOKIE'),
+            *self.get_validators(),
+        ))).encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == HTTPStatus.OK:
+                response['ETag'] = etag
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class CachedCountMixin:
+    """Кэширование числа публикаций для постраничного вывода"""
+
+    paginator_class = CachedCountPaginator
+    page_range_cap = PAGE_RANGE_CAP
+    count_cache_timeout = POST_COUNT_CACHE_TIMEOUT
+
+    def get_count_signature(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            signature=self.get_count_signature(),
+            page_range_cap=self.page_range_cap,
+            # Число публикаций меняется с выходом отложенной.
+            timeout=publication_timeout(self.count_cache_timeout),
+            **kwargs
+        )
+
+
+class PostListView(ReadReplicaMixin, ConditionalResponseMixin,
+                   AnonymousPageCacheMixin, CursorPaginationMixin,
+                   CachedCountMixin, ListView):
     """Список всех публикаций"""
 
     model = Post
@@ -29,10 +160,31 @@ class PostListView(ListView):
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        return Post.postpub.published().count_comment().order()
+        return Post.postpub.published_cached().count_comment().order()
+
+    def get_count_signature(self):
+        return ('index',)
+
 
+class CommentsPageMixin:
+    """Постраничная загрузка комментариев публикации по курсору"""
 
-class PostDetailView(DetailView):
+    comments_per_page = COMMENTS_PER_PAGE
+
+    def get_comments_page(self, post):
+        paginator = KeysetPaginator(
+            post.comments.select_related('author'),
+            self.comments_per_page,
+            COMMENT_CURSOR_ORDER
+        )
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
+class PostDetailView(ReadReplicaMixin, ConditionalResponseMixin,
+                     CommentsPageMixin, DetailView):
     """Отдельная публикация"""
 
     model = Post
@@ -40,29 +192,31 @@ class PostDetailView(DetailView):
     pk_url_kwarg = 'post_id'
 
     def get_object(self, queryset=None):
-        post_obj = super().get_object()
-        if post_obj.author == self.request.user:
-            return post_obj
-        return super().get_object(queryset=Post.postpub.published())
+        post = super().get_object(queryset)
+        if post.author != self.request.user and not post.is_public:
+            raise Http404('Публикация не найдена')
+        return post
 
     def get_queryset(self):
-        return (
-            super()
-            .get_queryset()
-            .prefetch_related(
-                'comments',
-            )
-        )
+        return Post.postpub.with_cached_relations()
 
     def get_context_data(self, **kwargs):
         return dict(
             **super().get_context_data(**kwargs),
             form=CommentForm(),
-            comments=self.object.comments.select_related('author')
+            comments=self.get_comments_page(self.object)
         )
 
 
-class CategoryListView(ListView):
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев публикации"""
+
+    template_name = 'includes/comment_list.html'
+
+
+class CategoryListView(ReadReplicaMixin, ConditionalResponseMixin,
+                       AnonymousPageCacheMixin, CursorPaginationMixin,
+                       CachedCountMixin, ListView):
     """Список постов в категории"""
 
     model = Post
@@ -70,20 +224,50 @@ class CategoryListView(ListView):
     slug_url_kwarg = 'category_slug'
     template_name = 'blog/category.html'
 
-    def get_queryset(self, queryset=None):
-        category = get_object_or_404(
-            Category,
-            slug=self.kwargs[self.slug_url_kwarg]
+    @cached_property
+    def category(self):
+        category = categories.get_published_by_slug(
+            self.kwargs[self.slug_url_kwarg]
         )
-        return category.posts(manager='postpub').published()
+        if category is None:
+            raise Http404('Категория не найдена')
+        return category
+
+    def get_queryset(self):
+        return Post.postpub.published_cached().filter(
+            category=self.category
+        ).count_comment().order()
+
+    def get_count_signature(self):
+        return ('category', self.category.pk)
 
     def get_context_data(self, **kwargs):
         return dict(
             **super().get_context_data(**kwargs),
-            category=get_published_objects(
-                Category,
-                slug=self.kwargs[self.slug_url_kwarg]
-            )
+            category=self.category,
+            stats=get_stats(CategoryStats, self.category.pk)
+        )
+
+
+class PostSearchView(ReadReplicaMixin, ListView):
+    """Поиск по заголовкам и текстам публикаций"""
+
+    model = Post
+    paginate_by = PAGE_NUMBER
+    template_name = 'blog/search.html'
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return Post.postpub.published_cached().search(self.query)
+
+    def get_context_data(self, **kwargs):
+        return dict(
+            **super().get_context_data(**kwargs),
+            query=self.query,
+            page_query=urlencode({'q': self.query}) + '&'
         )
 
 
@@ -126,7 +310,9 @@ class PostDeleteView(PostUpdateDeleteView, DeleteView):
     success_url = reverse_lazy('blog:index')
 
 
-class ProfileView(ListView):
+class ProfileView(ReadReplicaMixin, ConditionalResponseMixin,
+                  AnonymousPageCacheMixin, CursorPaginationMixin,
+                  CachedCountMixin, ListView):
     """Страница пользователя"""
 
     model = Post
@@ -134,24 +320,32 @@ class ProfileView(ListView):
     slug_url_kwarg = 'username'
     template_name = 'blog/profile.html'
 
-    def get_queryset(self):
-        author = get_object_or_404(
+    @cached_property
+    def author(self):
+        return get_object_or_404(
             User,
             username=self.kwargs[self.slug_url_kwarg]
         )
-        queryset = super().get_queryset().filter(author=author)
-        if author != self.request.user:
-            queryset = Post.postpub.published(
-            ).filter(author=author).count_comment().order()
-        return queryset
+
+    @property
+    def is_own_profile(self):
+        return self.author == self.request.user
+
+    def get_queryset(self):
+        if self.is_own_profile:
+            queryset = Post.postpub.with_cached_relations()
+        else:
+            queryset = Post.postpub.published_cached()
+        return queryset.filter(author=self.author).count_comment().order()
+
+    def get_count_signature(self):
+        return ('author', self.author.pk, self.is_own_profile)
 
     def get_context_data(self, **kwargs):
         return dict(
             **super().get_context_data(**kwargs),
-            profile=get_object_or_404(
-                User,
-                username=self.kwargs[self.slug_url_kwarg]
-            )
+            profile=self.author,
+            stats=get_stats(AuthorStats, self.author.pk)
         )
 
 
@@ -213,3 +407,19 @@ class CommentUpdateView(CommentUpdateDeleteMixin, UpdateView):
 
 class CommentDeleteView(CommentUpdateDeleteMixin, DeleteView):
     """Удаление комментария"""
+
+
+class AsyncPostListView(AsyncViewMixin, PostListView):
+    """Список всех публикаций под ASGI"""
+
+
+class AsyncPostDetailView(AsyncViewMixin, PostDetailView):
+    """Отдельная публикация под ASGI"""
+
+
+class AsyncCategoryListView(AsyncViewMixin, CategoryListView):
+    """Список постов в категории под ASGI"""
+
+
+class AsyncProfileView(AsyncViewMixin, ProfileView):
+    """Страница пользователя под ASGI"""
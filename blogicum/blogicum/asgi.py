@@ -3,5 +3,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_bootstrap5',
+    'core.apps.CoreConfig',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'debug_toolbar',
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.replica_routing_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,12 +80,90 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# Профиль базы выбирается переменной DJANGO_DB_PROFILE: sqlite или postgres.
+# Постоянные соединения живут CONN_MAX_AGE секунд и проверяются перед
+# каждым запросом; пул соединений Django 3.2 не предоставляет, для
+# PostgreSQL его роль выполняет внешний pgbouncer.
+DB_PROFILE = os.getenv('DJANGO_DB_PROFILE', 'sqlite')
+
+DB_CONNECTION = {
+    'CONN_MAX_AGE': int(os.getenv('DJANGO_CONN_MAX_AGE', 60)),
+    'CONN_HEALTH_CHECKS': True,
+}
+
+if DB_PROFILE == 'postgres':
+    def postgres_database(prefix):
+        return {
+            **DB_CONNECTION,
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv(f'{prefix}_NAME', 'blogicum'),
+            'USER': os.getenv(f'{prefix}_USER', 'blogicum'),
+            'PASSWORD': os.getenv(f'{prefix}_PASSWORD', ''),
+            'HOST': os.getenv(f'{prefix}_HOST', 'localhost'),
+            'PORT': os.getenv(f'{prefix}_PORT', '5432'),
+        }
+
+    DATABASES = {'default': postgres_database('DJANGO_DB')}
+    if os.getenv('DJANGO_DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **postgres_database('DJANGO_DB_REPLICA'),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            **DB_CONNECTION,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Ожидание блокировки вместо ошибки «database is locked».
+            'OPTIONS': {'timeout': 20},
+        }
+    }
+    if os.getenv('DJANGO_DB_REPLICA_NAME'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': os.getenv('DJANGO_DB_REPLICA_NAME'),
+            'TEST': {'MIRROR': 'default'},
+        }
+
+# Реплики только для чтения; без них все запросы идут в default.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['core.routers.ReadReplicaRouter']
+
+# Сколько секунд после своей записи пользователь читает основную базу.
+REPLICA_STICKY_COOKIE = 'read_primary'
+REPLICA_STICKY_SECONDS = 10
+
+# Прагмы каждого нового соединения с SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Кэш, общий для всех процессов: на нём держатся версии групп данных
+# (blog.cache), по смене которых процессы сбрасывают свои снимки и
+# страницы. Процессный LocMemCache не подходит: смену версии увидел бы
+# только процесс, сохранивший изменения. По умолчанию кэш хранится в
+# файлах и общий для процессов одного сервера; для нескольких серверов
+# задайте DJANGO_CACHE_BACKEND=
+# django.core.cache.backends.memcached.PyMemcacheCache
+# и DJANGO_CACHE_LOCATION=host:11211.
+CACHE_BACKEND = os.getenv(
+    'DJANGO_CACHE_BACKEND',
+    'django.core.cache.backends.filebased.FileBasedCache'
+)
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', BASE_DIR / 'cache'),
     }
 }
+if CACHE_BACKEND.endswith('FileBasedCache'):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
 
 
 # Password validation
@@ -138,8 +219,30 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Адрес сайта для абсолютных ссылок в письмах
+SITE_URL = os.getenv('DJANGO_SITE_URL', 'http://localhost:8000')
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+# Постраничный вывод лент по курсору (pub_date, id) вместо номера страницы
+CURSOR_PAGINATION = False
+
+# Асинхронные представления страниц для чтения; включаются в asgi.py
+ASYNC_VIEWS = os.getenv('DJANGO_ASYNC_VIEWS') == '1'
+
+# Число потоков (и соединений с базой) для асинхронных представлений
+DB_EXECUTOR_WORKERS = int(os.getenv('DJANGO_DB_EXECUTOR_WORKERS', 10))
+
+# Очередь фоновых задач (core.tasks); обработчик: manage.py run_tasks.
+# При TASKS_EAGER задачи без задержки выполняются сразу после фиксации
+# транзакции; отложенные ждут run_tasks.
+TASKS_EAGER = False
+TASK_MAX_ATTEMPTS = 5
+# Пауза перед первым повтором; затем удваивается.
+TASK_RETRY_DELAY = 10
+# Через сколько секунд зависшая задача возвращается в очередь.
+TASK_LOCK_TIMEOUT = 10 * 60
@@ -2,3 +2,21 @@ TITLE_MAX_LENGTH = 256
 COUNT_POST_PAGE = 5
 PAGE_NUMBER = 10
 POST_ORDER = '-pub_date'
+POST_CURSOR_ORDER = (POST_ORDER, '-id')
+POST_COUNT_CACHE_TIMEOUT = 60
+PAGE_RANGE_CAP = 3
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+FEED_PAGE_CACHE_TIMEOUT = 5 * 60
+COMMENTS_PER_PAGE = 50
+COMMENT_CURSOR_ORDER = ('created_at', 'id')
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 80
+COMMENT_DIGEST_WINDOW = 15 * 60
+COMMENT_DIGEST_BATCH = 500
+SEARCH_RESULTS_LIMIT = 500
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_TEXT_WEIGHT = 1.0
+SEARCH_JOURNAL_TIMEOUT = 60 * 60
+SEARCH_JOURNAL_LIMIT = 1000
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from core.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created_at'
+    )
+    list_filter = (
+        'status',
+    )
+    search_fields = (
+        'name',
+        'dedup_key'
+    )
@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.signals import close_unusable_connections
+
+_executor = None
+
+
+def get_db_executor():
+    """Пул потоков, в котором выполняются обращения к базе данных"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_EXECUTOR_WORKERS,
+            thread_name_prefix='db'
+        )
+    return _executor
+
+
+def _call_with_connection(func, *args, **kwargs):
+    # У каждого потока пула своё соединение; закрываем его по тем же
+    # правилам, что и в конце обычного запроса (CONN_MAX_AGE, ошибки).
+    close_old_connections()
+    close_unusable_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_db(func, *args, **kwargs):
+    """Выполнить синхронный код с запросами к базе в пуле потоков"""
+    loop = asyncio.get_running_loop()
+    # Контекст запроса (например, выбранная реплика) переносится в поток.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_db_executor(),
+        partial(context.run, _call_with_connection, func, *args, **kwargs)
+    )
+
+
+class AsyncViewMixin:
+    """Асинхронный вариант представления для работы под ASGI.
+
+    Обработка запроса и отрисовка шаблона выполняются в пуле потоков
+    базы данных, поэтому один процесс обслуживает несколько медленных
+    клиентов одновременно. При выключенном ASYNC_VIEWS представление
+    остаётся синхронным.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            return await run_in_db(cls.render_view, view, request,
+                                   *args, **kwargs)
+
+        async_view.view_class = view.view_class
+        async_view.view_initkwargs = view.view_initkwargs
+        async_view.__doc__ = view.__doc__
+        async_view.__module__ = view.__module__
+        async_view.__name__ = view.__name__
+        return async_view
+
+    @staticmethod
+    def render_view(view, request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        return response
@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.models import Task
+from core.tasks import claim_tasks, requeue_stale_tasks, run_task
+
+
+def run_with_connection(task):
+    # Потоки пула держат свои соединения; закрываем их по правилам
+    # обычного запроса.
+    close_old_connections()
+    try:
+        return run_task(task)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди в пуле потоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков, выполняющих задачи.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        done = failed = 0
+        with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='task') as pool:
+            while True:
+                requeue_stale_tasks()
+                tasks = claim_tasks(workers)
+                if not tasks:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                for task in pool.map(run_with_connection, tasks):
+                    if task.status == Task.DONE:
+                        done += 1
+                    elif task.status == Task.FAILED:
+                        failed += 1
+                        self.stderr.write(f'Задача {task.pk} не выполнена: '
+                                          f'{task.last_error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
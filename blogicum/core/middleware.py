@@ -0,0 +1,58 @@
+import asyncio
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils.decorators import sync_and_async_middleware
+
+from core.routers import choose_read_database, read_database
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def get_read_database(request):
+    """Реплика для чтения, если представление её допускает"""
+    if (request.method not in SAFE_METHODS
+            or settings.REPLICA_STICKY_COOKIE in request.COOKIES):
+        return 'default'
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return 'default'
+    view_class = getattr(match.func, 'view_class', None)
+    if not getattr(view_class, 'read_from_replica', False):
+        return 'default'
+    return choose_read_database()
+
+
+def stick_to_primary(request, response):
+    # После собственной записи пользователь какое-то время читает
+    # основную базу и видит свои изменения, даже если реплика отстаёт.
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            settings.REPLICA_STICKY_COOKIE, '1',
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True, samesite='Lax'
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """Выбор базы для чтения на время обработки запроса"""
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = read_database.set(get_read_database(request))
+            try:
+                response = await get_response(request)
+            finally:
+                read_database.reset(token)
+            return stick_to_primary(request, response)
+    else:
+        def middleware(request):
+            token = read_database.set(get_read_database(request))
+            try:
+                response = get_response(request)
+            finally:
+                read_database.reset(token)
+            return stick_to_primary(request, response)
+    return middleware
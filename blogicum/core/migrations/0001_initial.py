@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('name', models.CharField(max_length=255, verbose_name='Функция')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Аргументы')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Именованные аргументы')),
+                ('dedup_key', models.CharField(blank=True, help_text='Пока задача с этим ключом в очереди, такая же не добавляется.', max_length=255, verbose_name='Ключ уникальности')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнена'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Выполнить после')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'задача',
+                'verbose_name_plural': 'Задачи',
+                'ordering': ('run_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['run_at', 'id'], name='task_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending'), models.Q(('dedup_key', ''), _negated=True)), fields=('dedup_key',), name='task_pending_dedup_key'),
+        ),
+    ]
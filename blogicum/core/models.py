@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class PublCreateModel(models.Model):
@@ -20,3 +21,65 @@ class PublPublishedModel(PublCreateModel):
 
     class Meta:
         abstract = True
+
+
+class Task(PublCreateModel):
+    """Отложенная задача для фонового обработчика run_tasks"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Функция', max_length=255)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    kwargs = models.JSONField('Именованные аргументы', default=dict,
+                              blank=True)
+    dedup_key = models.CharField(
+        'Ключ уникальности',
+        max_length=255,
+        blank=True,
+        help_text='Пока задача с этим ключом в очереди, такая же '
+                  'не добавляется.'
+    )
+    status = models.CharField(
+        'Состояние', max_length=16, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=5
+    )
+    run_at = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True,
+                                     blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('run_at', 'id')
+        indexes = (
+            models.Index(
+                fields=('run_at', 'id'),
+                condition=models.Q(status='pending'),
+                name='task_pending_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('dedup_key',),
+                condition=models.Q(status='pending') & ~models.Q(
+                    dedup_key=''
+                ),
+                name='task_pending_dedup_key',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,39 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# База для чтения в текущем запросе; выбирается ReplicaRoutingMiddleware.
+read_database = ContextVar('read_database', default='default')
+
+
+class ReadReplicaMixin:
+    """Представление только для чтения, которому подходят данные реплики"""
+
+    read_from_replica = True
+
+
+def choose_read_database():
+    if not settings.DATABASE_REPLICAS:
+        return 'default'
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReadReplicaRouter:
+    """Чтение с реплик для отмеченных представлений, запись в основную базу"""
+
+    def db_for_read(self, model, **hints):
+        # Внутри транзакции читаем то, что только что записали.
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
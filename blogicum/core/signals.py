@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Прагмы SQLite для одновременной записи и чтения"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+@receiver(request_started)
+def close_unusable_connections(**kwargs):
+    """Проверка постоянных соединений перед началом запроса"""
+    for connection in connections.all():
+        if (connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and connection.connection is not None
+                and not connection.is_usable()):
+            connection.close()
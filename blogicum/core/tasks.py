@@ -0,0 +1,109 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Task
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, *args, dedup_key='', delay=0, **kwargs):
+    """Поставить вызов func(*args, **kwargs) в очередь задач.
+
+    Задача сохраняется в той же транзакции, что и изменения, которые её
+    вызвали, и видна обработчику только после фиксации. При TASKS_EAGER
+    функция без задержки выполняется сразу после фиксации транзакции;
+    отложенные задачи и в этом режиме ждут своего времени в очереди.
+    """
+    if settings.TASKS_EAGER and not delay:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return None
+    task = Task(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs,
+        dedup_key=dedup_key,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=settings.TASK_MAX_ATTEMPTS,
+    )
+    try:
+        with transaction.atomic():
+            task.save()
+    except IntegrityError:
+        # Такая же задача уже ждёт в очереди.
+        return None
+    return task
+
+
+def claim_tasks(limit):
+    """Забрать до limit готовых к выполнению задач"""
+    now = timezone.now()
+    candidates = Task.objects.filter(
+        status=Task.PENDING, run_at__lte=now
+    ).values_list('id', flat=True)[:limit]
+    claimed = []
+    for task_id in candidates:
+        # Условное обновление: задачу забирает только один обработчик.
+        if Task.objects.filter(pk=task_id, status=Task.PENDING).update(
+                status=Task.RUNNING, locked_at=now):
+            claimed.append(task_id)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def save_task(task, fields):
+    """Сохранить задачу; если такая же уже ждёт в очереди — как выполненную"""
+    try:
+        with transaction.atomic():
+            task.save(update_fields=fields)
+    except IntegrityError:
+        # Такая же задача уже ждёт в очереди и выполнит эту работу.
+        task.status = Task.DONE
+        task.save(update_fields=fields)
+
+
+def requeue_stale_tasks():
+    """Вернуть в очередь задачи обработчиков, которые не завершились"""
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(
+            seconds=settings.TASK_LOCK_TIMEOUT
+        ),
+    )
+    requeued = stale.filter(dedup_key='').update(
+        status=Task.PENDING, locked_at=None
+    )
+    for task in stale.exclude(dedup_key=''):
+        task.status = Task.PENDING
+        task.locked_at = None
+        save_task(task, ('status', 'locked_at'))
+        requeued += task.status == Task.PENDING
+    return requeued
+
+
+def run_task(task):
+    """Выполнить задачу; при ошибке повторить позже с нарастающей паузой"""
+    task.attempts += 1
+    try:
+        import_string(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + timedelta(
+                seconds=settings.TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            )
+        else:
+            task.status = Task.FAILED
+    else:
+        task.status = Task.DONE
+    task.locked_at = None
+    save_task(task, (
+        'attempts', 'status', 'run_at', 'locked_at', 'last_error'
+    ))
+    return task
@@ -1,4 +1,11 @@
 from django.shortcuts import render
+from django.views.generic import TemplateView
+
+from core.aio import AsyncViewMixin
+
+
+class AsyncTemplateView(AsyncViewMixin, TemplateView):
+    """Статическая страница под ASGI"""
 
 
 def page_not_found(request, exception):
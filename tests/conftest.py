@@ -32,6 +32,27 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def media_root(tmp_path):
+    with override_settings(
+        MEDIA_ROOT=tmp_path / 'media', TASKS_EAGER=True
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    from django.core.cache import cache
+
+    # Отдельный общий кэш для каждого теста, не затрагивающий кэш проекта.
+    settings.CACHES = {'default': {
+        **settings.CACHES['default'], 'LOCATION': tmp_path / 'cache'
+    }}
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.db.models.signals import pre_init
+from django.test import RequestFactory, override_settings
+
+# Потоки пула открывают собственные соединения с базой, поэтому данные
+# теста должны быть зафиксированы.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@override_settings(ASYNC_VIEWS=True)
+def test_async_read_views(post_with_published_location):
+    from blog import views
+    from pages.views import AsyncTemplateView
+
+    post = post_with_published_location
+    cases = [
+        (views.AsyncPostListView.as_view(), '/', {}),
+        (views.AsyncPostDetailView.as_view(), f'/posts/{post.id}/',
+         {'post_id': post.id}),
+        (views.AsyncCategoryListView.as_view(),
+         f'/category/{post.category.slug}/',
+         {'category_slug': post.category.slug}),
+        (views.AsyncProfileView.as_view(),
+         f'/profile/{post.author.username}/',
+         {'username': post.author.username}),
+    ]
+    for view, _, _ in cases:
+        assert asyncio.iscoroutinefunction(view), (
+            'Убедитесь, что при включённом ASYNC_VIEWS представления '
+            'страниц для чтения асинхронные.'
+        )
+
+    threads = set()
+
+    def remember_thread(sender, **kwargs):
+        threads.add(threading.current_thread().name)
+
+    def make_request(url):
+        request = RequestFactory().get(url)
+        request.user = AnonymousUser()
+        return request
+
+    async def fetch_all():
+        return await asyncio.gather(*(
+            view(make_request(url), **kwargs)
+            for view, url, kwargs in cases
+        ))
+
+    pre_init.connect(remember_thread)
+    try:
+        responses = async_to_sync(fetch_all)()
+    finally:
+        pre_init.disconnect(remember_thread)
+    for response in responses:
+        assert response.status_code == HTTPStatus.OK
+        assert post.title in response.content.decode()
+    assert threads and all(name.startswith('db') for name in threads), (
+        'Убедитесь, что запросы асинхронных представлений выполняются '
+        'в пуле потоков базы данных.'
+    )
+
+    about = AsyncTemplateView.as_view(template_name='pages/about.html')
+    response = async_to_sync(about)(make_request('/pages/about/'))
+    assert response.status_code == HTTPStatus.OK
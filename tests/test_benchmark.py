@@ -0,0 +1,212 @@
+"""Замеры стоимости страниц блога на синтетических данных.
+
+Запускается только при заданном размере набора данных, например:
+
+    BENCHMARK_POSTS=10000 BENCHMARK_REPORT=bench.json \
+        pytest tests/test_benchmark.py
+
+Отчёт в JSON с отсортированными ключами удобно сравнивать между коммитами;
+без BENCHMARK_REPORT он не сохраняется.
+"""
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from itertools import cycle
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template.backends.django import Template
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+
+BENCHMARK_POSTS = int(os.getenv('BENCHMARK_POSTS', 0))
+BENCHMARK_COMMENTS = int(os.getenv('BENCHMARK_COMMENTS', BENCHMARK_POSTS))
+BENCHMARK_USERS = int(
+    os.getenv('BENCHMARK_USERS', max(1, BENCHMARK_POSTS // 100))
+)
+BENCHMARK_REPEAT = int(os.getenv('BENCHMARK_REPEAT', 5))
+BENCHMARK_BATCH = int(os.getenv('BENCHMARK_BATCH', 5000))
+BENCHMARK_REPORT = os.getenv('BENCHMARK_REPORT')
+# Адреса, которые принимают только отправку формы.
+POST_ONLY_URLS = {'blog:add_comment'}
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not BENCHMARK_POSTS,
+        reason='Укажите BENCHMARK_POSTS, чтобы запустить замеры.',
+    ),
+]
+
+
+def bulk_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BENCHMARK_BATCH:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+
+
+@pytest.fixture
+def dataset(
+        mixer, user, another_user, published_category, another_category,
+        published_locations):
+    from blog.models import Comment, Post
+    from blog.search import search_index
+
+    User = get_user_model()
+    bulk_create(User, (
+        User(username=f'bench_user_{i}')
+        for i in range(BENCHMARK_USERS)
+    ))
+    authors = list(User.objects.all())
+    now = timezone.now()
+    bulk_create(Post, (
+        Post(
+            title=f'Публикация {i}',
+            text=f'Текст публикации номер {i}. ' * 10,
+            pub_date=now - timedelta(minutes=i),
+            author=author,
+            category=category,
+            location=location,
+        )
+        for i, author, category, location in zip(
+            range(BENCHMARK_POSTS),
+            cycle(authors),
+            cycle((published_category, another_category)),
+            cycle(published_locations),
+        )
+    ))
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    bulk_create(Comment, (
+        Comment(text=f'Комментарий {i}', author=author, post_id=post_id)
+        for i, author, post_id in zip(
+            range(BENCHMARK_COMMENTS), cycle(authors), cycle(post_ids)
+        )
+    ))
+    Post.postpub.get_queryset().recount_comments()
+    # bulk_create не отправляет сигналов: флаги видимости, поисковый
+    # индекс и статистику строим так же, как после import_posts.
+    Post.postpub.refresh_visibility()
+    search_index.rebuild()
+    call_command('rebuild_stats', stdout=StringIO())
+    assert Post.postpub.published().exists()
+    post = Post.objects.order_by('-comment_count').first()
+    return {
+        'post_id': post.id,
+        'comment_id': post.comments.first().id,
+        'category_slug': published_category.slug,
+        'username': user.username,
+    }
+
+
+def iter_url_names(patterns, namespace='', kwargs=()):
+    for pattern in patterns:
+        pattern_kwargs = (*kwargs, *pattern.pattern.converters)
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(
+                pattern.url_patterns,
+                pattern.namespace or namespace,
+                pattern_kwargs,
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}', pattern_kwargs
+
+
+@pytest.fixture
+def render_timer(monkeypatch):
+    timer = {'depth': 0, 'time': 0.0}
+    render = Template.render
+
+    def timed_render(self, *args, **kwargs):
+        timer['depth'] += 1
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timer['depth'] -= 1
+            if not timer['depth']:
+                timer['time'] += time.perf_counter() - start
+
+    monkeypatch.setattr(Template, 'render', timed_render)
+    return timer
+
+
+def measure(client, url, render_timer):
+    render_timer['time'] = 0.0
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url)
+        total_time = time.perf_counter() - start
+    return {
+        'status': response.status_code,
+        'queries': len(queries),
+        'sql_time': sum(float(query['time']) for query in queries),
+        'render_time': render_timer['time'],
+        'total_time': total_time,
+    }
+
+
+def median(samples):
+    return {
+        key: statistics.median(sample[key] for sample in samples)
+        for key in samples[0]
+    }
+
+
+def test_benchmark_views(dataset, user, render_timer):
+    from blogicum.urls import urlpatterns
+
+    author_client = Client(raise_request_exception=False)
+    author_client.force_login(user)
+    clients = {
+        'anonymous': Client(raise_request_exception=False),
+        'authenticated': author_client,
+    }
+    report = {
+        'dataset': {
+            'posts': BENCHMARK_POSTS,
+            'comments': BENCHMARK_COMMENTS,
+            'users': BENCHMARK_USERS,
+        },
+        'urls': {},
+    }
+    for name, url_kwargs in iter_url_names(urlpatterns):
+        if (not name.startswith(('blog:', 'pages:'))
+                or name in POST_ONLY_URLS):
+            continue
+        url = reverse(name, kwargs={key: dataset[key] for key in url_kwargs})
+        report['urls'][name] = {}
+        for client_name, client in clients.items():
+            cache.clear()
+            cold = measure(client, url, render_timer)
+            warm = median([
+                measure(client, url, render_timer)
+                for _ in range(BENCHMARK_REPEAT)
+            ])
+            report['urls'][name][client_name] = {
+                'url': url, 'cold': cold, 'warm': warm,
+            }
+
+    if BENCHMARK_REPORT:
+        with open(BENCHMARK_REPORT, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+
+    failed = [
+        f'{name} ({client_name})'
+        for name, results in report['urls'].items()
+        for client_name, result in results.items()
+        if result['cold']['status'] >= HTTPStatus.INTERNAL_SERVER_ERROR
+    ]
+    assert not failed, f'Страницы вернули ошибку: {", ".join(failed)}'
@@ -0,0 +1,126 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_fragment_cache(user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+
+    category = post.category
+    category.title = 'Переименованная категория'
+    category.save()
+    assert category.title in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточка публикации обновляется после изменения '
+        'категории.'
+    )
+
+    post.title = 'Новый заголовок публикации'
+    post.save()
+    assert post.title in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточка публикации обновляется после изменения '
+        'публикации.'
+    )
+
+    type(post).objects.filter(pk=post.pk).update(title='Без сигналов')
+    assert 'Без сигналов' not in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточки публикаций берутся из кэша фрагментов.'
+    )
+
+
+def test_anonymous_feed_page_cache(
+        client, post_with_published_location):
+    post = post_with_published_location
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        client.get(url)
+        type(post).objects.filter(pk=post.pk).update(title='Без сигналов')
+        assert 'Без сигналов' not in client.get(url).content.decode(), (
+            'Убедитесь, что страницы ленты для анонимных пользователей '
+            'берутся из кэша.'
+        )
+
+        post.refresh_from_db()
+        post.title = f'Заголовок для {url}'
+        post.save()
+        assert post.title in client.get(url).content.decode(), (
+            'Убедитесь, что кэш страниц ленты сбрасывается после изменения '
+            'публикации.'
+        )
+
+
+def test_anonymous_feed_page_cache_key_ignores_unknown_params(
+        client, post_with_published_location):
+    from django.core.cache import cache
+
+    client.get('/?page=1')
+    cached = len(cache._list_cache_files())
+    for number in range(5):
+        client.get(f'/?page=1&utm={number}')
+    assert len(cache._list_cache_files()) == cached, (
+        'Убедитесь, что посторонние параметры запроса не добавляют '
+        'страницы в кэш.'
+    )
+
+
+def test_anonymous_feed_page_cache_waits_for_scheduled_post(
+        client, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    assert post.title not in client.get('/').content.decode()
+    time.sleep(1.5)
+    call_command('publish_scheduled', '--once')
+    assert post.title in client.get('/').content.decode(), (
+        'Убедитесь, что кэш страниц ленты не переживает время ближайшей '
+        'отложенной публикации.'
+    )
+
+
+def test_versions_shared_between_workers(monkeypatch):
+    from django.core.cache import caches
+    from django.core.cache.backends.locmem import LocMemCache
+
+    from blog import cache as blog_cache
+
+    # Отдельные экземпляры кэша, как в разных процессах сервера.
+    first, second = (caches.create_connection('default') for _ in range(2))
+    assert not isinstance(first, LocMemCache), (
+        'Убедитесь, что версии кэша хранятся в общем для процессов кэше.'
+    )
+    monkeypatch.setattr(blog_cache, 'cache', first)
+    version = blog_cache.get_version(blog_cache.CATEGORIES_VERSION)
+    monkeypatch.setattr(blog_cache, 'cache', second)
+    assert blog_cache.get_version(blog_cache.CATEGORIES_VERSION) == version
+
+    blog_cache.bump_version(blog_cache.CATEGORIES_VERSION)
+    monkeypatch.setattr(blog_cache, 'cache', first)
+    assert blog_cache.get_version(blog_cache.CATEGORIES_VERSION) != version, (
+        'Убедитесь, что смену версии видят все процессы.'
+    )
+
+
+def test_category_cache_by_slug(published_category, mixer):
+    from blog.relations import categories
+
+    hidden = mixer.blend('blog.Category', is_published=False)
+    assert categories.get_published_by_slug(
+        published_category.slug
+    ) == published_category
+    assert categories.get_published_by_slug(hidden.slug) is None
+
+    published_category.slug = 'renamed'
+    published_category.save()
+    assert categories.get_published_by_slug('renamed') == published_category, (
+        'Убедитесь, что словарь категорий по slug перестраивается при '
+        'изменении категорий.'
+    )
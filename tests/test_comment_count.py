@@ -0,0 +1,81 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location, user_client):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == len(comments), (
+        'Убедитесь, что при добавлении комментария увеличивается '
+        'сохранённое число комментариев публикации.'
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == len(comments) - 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'сохранённое число комментариев публикации.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.comment_count = 100
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == len(comments) - 1
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command('recount_comments')
+
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_post_save_keeps_background_fields(post_with_published_location):
+    post = post_with_published_location
+    variants = {'source': post.image.name, 'jpeg': []}
+    type(post).objects.filter(pk=post.pk).update(image_variants=variants)
+
+    post.title = 'Новый заголовок'
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants == variants, (
+        'Убедитесь, что сохранение публикации не затирает уменьшенные '
+        'копии, записанные фоновой задачей.'
+    )
+
+
+def test_moved_comment_recounts_both_posts(
+        mixer, another_user, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    from blog.models import AuthorStats, Comment
+    from blog.stats import get_stats
+
+    old_post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        new_post = mixer.blend(
+            'blog.Post', author=another_user, category=old_post.category,
+            image=''
+        )
+        mixer.blend('blog.Comment', post=old_post)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        comment = Comment.objects.get()
+        comment.post = new_post
+        comment.save()
+    old_post.refresh_from_db()
+    new_post.refresh_from_db()
+    assert (old_post.comment_count, new_post.comment_count) == (0, 1), (
+        'Убедитесь, что при переносе комментария в другую публикацию '
+        'пересчитываются счётчики обеих публикаций.'
+    )
+    assert get_stats(AuthorStats, old_post.author_id).comments_received == 0
+    assert get_stats(AuthorStats, another_user.pk).comments_received == 1
@@ -0,0 +1,92 @@
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_digest(mixer, user, another_user, published_category):
+    from django.core import mail
+
+    user.email = 'author@example.com'
+    user.save()
+    posts = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    for post in posts:
+        mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=posts[0], author=user)
+
+    call_command('send_comment_digests')
+    assert len(mail.outbox) == 1, (
+        'Убедитесь, что автор получает одно письмо на все новые '
+        'комментарии.'
+    )
+    message = mail.outbox[0]
+    assert message.to == [user.email]
+    for post in posts:
+        assert post.title in message.body
+
+    call_command('send_comment_digests')
+    assert len(mail.outbox) == 1, (
+        'Убедитесь, что об одном комментарии автор уведомляется один раз.'
+    )
+
+
+@override_settings(TASKS_EAGER=False)
+def test_comment_digest_is_scheduled_once(
+        mixer, another_user, post_with_published_location):
+    from django.utils import timezone
+
+    from core.models import Task
+
+    mixer.cycle(3).blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user
+    )
+    tasks = Task.objects.filter(dedup_key='comment_digest')
+    assert tasks.count() == 1
+    assert tasks.get().run_at > timezone.now(), (
+        'Убедитесь, что рассылка откладывается на окно накопления.'
+    )
+
+
+@override_settings(SITE_URL='https://blogicum.example/')
+def test_comment_digest_links_and_batches(
+        monkeypatch, mixer, user, another_user, post_with_published_location):
+    from django.core import mail
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from blog.models import Comment
+
+    monkeypatch.setattr('blog.tasks.COMMENT_DIGEST_BATCH', 2)
+    opened = []
+    monkeypatch.setattr(
+        'django.core.mail.backends.locmem.EmailBackend.open',
+        lambda backend: opened.append(backend), raising=False
+    )
+    post = post_with_published_location
+    user.email = 'author@example.com'
+    user.save()
+    mixer.cycle(5).blend('blog.Comment', post=post, author=another_user)
+
+    with CaptureQueriesContext(connection) as queries:
+        call_command('send_comment_digests')
+    assert not Comment.objects.filter(is_notified=False).exists()
+    selects = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT') and 'blog_comment' in query['sql']
+    ]
+    assert selects and all('LIMIT 2' in sql for sql in selects), (
+        'Убедитесь, что комментарии для рассылки выбираются порциями.'
+    )
+    assert len(opened) == 1, (
+        'Убедитесь, что вся рассылка идёт через одно открытое соединение с '
+        'почтовым сервером.'
+    )
+    link = f'https://blogicum.example/posts/{post.pk}/'
+    assert link in mail.outbox[0].body, (
+        'Убедитесь, что ссылки в письмах абсолютные и строятся из '
+        'SITE_URL.'
+    )
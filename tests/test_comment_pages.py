@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+from bs4 import BeautifulSoup
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_PER_PAGE = 2
+
+
+@pytest.fixture
+def small_comment_pages(monkeypatch):
+    from blog.views import PostDetailView
+
+    monkeypatch.setattr(
+        PostDetailView, 'comments_per_page', COMMENTS_PER_PAGE
+    )
+
+
+def test_comment_pages(
+        mixer, client, small_comment_pages, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend('blog.Comment', post=post)
+    expected = sorted(
+        comments, key=lambda comment: (comment.created_at, comment.id)
+    )
+
+    response = client.get(f'/posts/{post.id}/')
+    loaded = list(response.context['comments'])
+    assert loaded == expected[:COMMENTS_PER_PAGE], (
+        'Убедитесь, что на странице публикации выводится только первая '
+        'порция комментариев.'
+    )
+
+    link = BeautifulSoup(response.content, 'html.parser').find(
+        'a', attrs={'data-fragment': True}
+    )
+    while link:
+        fragment = client.get(link['data-fragment'])
+        assert fragment.status_code == HTTPStatus.OK
+        assert b'<html' not in fragment.content, (
+            'Убедитесь, что следующая порция комментариев возвращается '
+            'фрагментом без общего шаблона.'
+        )
+        loaded.extend(fragment.context['comments'])
+        link = BeautifulSoup(fragment.content, 'html.parser').find(
+            'a', attrs={'data-fragment': True}
+        )
+    assert loaded == expected
+
+
+def test_comment_pages_of_hidden_post(client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
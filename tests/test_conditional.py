@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def relation_caches():
+    from blog.relations import categories, locations
+
+    categories.load()
+    locations.load()
+
+
+def test_post_detail_not_modified(
+        client, mixer, post_with_published_location, relation_caches,
+        django_assert_num_queries):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    response = client.get(url)
+    etag = response['ETag']
+    assert etag and 'Cookie' in response['Vary'], (
+        'Убедитесь, что страница публикации отдаёт ETag и Vary: Cookie.'
+    )
+
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что неизменившаяся публикация отдаётся ответом 304 '
+        'без запросов к базе.'
+    )
+
+    comment = mixer.blend('blog.Comment', post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert comment.text.splitlines()[0] in response.content.decode(), (
+        'Убедитесь, что новый комментарий меняет ETag публикации.'
+    )
+
+
+def test_etag_depends_on_user(
+        client, user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что копия страницы анонимного пользователя не '
+        'подходит авторизованному.'
+    )
+    assert response['ETag'] != etag
+
+
+def test_etag_depends_on_csrf_token(user_client, post_with_published_location):
+    from django.conf import settings
+
+    url = f'/posts/{post_with_published_location.id}/'
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = 'a' * 64
+    etag = user_client.get(url)['ETag']
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = 'b' * 64
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что после смены CSRF-токена страница с формами не '
+        'отдаётся из копии клиента со старым токеном.'
+    )
+    assert response['ETag'] != etag
+
+
+@pytest.mark.parametrize('url', ('/', '/category/{slug}/', '/profile/{user}/'))
+def test_lists_not_modified(
+        url, client, mixer, post_with_published_location, relation_caches,
+        django_assert_num_queries):
+    post = post_with_published_location
+    url = url.format(slug=post.category.slug, user=post.author.username)
+    etag = client.get(url)['ETag']
+
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f'Убедитесь, что неизменившаяся страница `{url}` отдаётся '
+        'ответом 304 без запросов к базе.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert post.title in response.content.decode()
+
+
+def test_list_etag_changes_on_scheduled_publication(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    scheduled = mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        location=post.location, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    etag = client.get('/')['ETag']
+    assert client.get('/', HTTP_IF_NONE_MATCH=etag).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+
+    time.sleep(1.1)
+    call_command('publish_scheduled', '--once')
+    response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ETag ленты меняется с выходом отложенной публикации.'
+    )
+    assert scheduled.title in response.content.decode()
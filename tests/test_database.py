@@ -0,0 +1,88 @@
+import pytest
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout, = cursor.fetchone()
+    assert busy_timeout > 0, (
+        'Убедитесь, что соединения с SQLite ждут снятия блокировки.'
+    )
+
+
+@pytest.fixture
+def routed_database():
+    """База, которую роутер выбрал бы для чтения внутри представления"""
+    from blog.models import Post
+    from core.middleware import replica_routing_middleware
+    from core.routers import ReadReplicaRouter
+
+    def get_response(request):
+        response = HttpResponse()
+        response.database = ReadReplicaRouter().db_for_read(Post)
+        return response
+
+    return replica_routing_middleware(get_response)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+def test_read_replica_router(routed_database):
+    from core.routers import ReadReplicaRouter
+
+    factory = RequestFactory()
+    assert routed_database(factory.get('/')).database == 'replica', (
+        'Убедитесь, что лента читается с реплики.'
+    )
+    assert routed_database(
+        factory.get('/posts/create/')
+    ).database == 'default', (
+        'Убедитесь, что формы создания и изменения читают основную базу.'
+    )
+    response = routed_database(factory.post('/posts/1/comment/'))
+    assert response.database == 'default'
+    assert settings.REPLICA_STICKY_COOKIE in response.cookies
+
+    factory.cookies[settings.REPLICA_STICKY_COOKIE] = '1'
+    assert routed_database(factory.get('/')).database == 'default', (
+        'Убедитесь, что после своей записи пользователь читает основную '
+        'базу.'
+    )
+    assert not ReadReplicaRouter().allow_migrate('replica', 'blog')
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(DATABASE_REPLICAS=['replica'])
+def test_read_replica_router_inside_transaction():
+    from blog.models import Post
+    from core.routers import ReadReplicaRouter, read_database
+
+    token = read_database.set('replica')
+    try:
+        with transaction.atomic():
+            assert ReadReplicaRouter().db_for_read(Post) == 'default', (
+                'Убедитесь, что внутри транзакции чтение идёт из основной '
+                'базы.'
+            )
+    finally:
+        read_database.reset(token)
+
+
+@pytest.mark.django_db
+def test_loaddata_db_json():
+    from django.core.management import call_command
+
+    from blog.models import Post
+
+    call_command('loaddata', str(settings.BASE_DIR.parent / 'db.json'))
+    assert not Post.objects.filter(updated_at=None).exists(), (
+        'Убедитесь, что учебные данные из db.json загружаются командой '
+        'loaddata.'
+    )
+    assert Post.postpub.published().exists(), (
+        'Убедитесь, что публикации из фикстур сразу видны в лентах.'
+    )
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feeds(client, post_with_published_location, another_user):
+    post = post_with_published_location
+    urls = (
+        '/rss/', '/atom/',
+        f'/category/{post.category.slug}/rss/',
+        f'/category/{post.category.slug}/atom/',
+        f'/profile/{post.author.username}/rss/',
+        f'/profile/{post.author.username}/atom/',
+    )
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert post.title in response.content.decode(), (
+            f'Убедитесь, что лента `{url}` содержит публикации.'
+        )
+        assert response['ETag'] and response['Last-Modified']
+    assert 'atom' in client.get('/atom/')['Content-Type']
+    empty_feed = client.get(f'/profile/{another_user.username}/rss/')
+    assert post.title not in empty_feed.content.decode()
+
+
+def test_feed_conditional_get(
+        client, post_with_published_location, django_assert_num_queries):
+    post = post_with_published_location
+    etag = client.get('/rss/')['ETag']
+
+    # Только max(pub_date): категории уже в кэше процесса.
+    with django_assert_num_queries(1):
+        response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что неизменившаяся лента отдаётся ответом 304.'
+    )
+    with django_assert_num_queries(1):
+        assert client.get('/rss/').status_code == HTTPStatus.OK, (
+            'Убедитесь, что лента сериализуется один раз и берётся из кэша.'
+        )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert post.title in response.content.decode(), (
+        'Убедитесь, что лента обновляется после изменения публикации.'
+    )
+
+
+def test_author_feed_resolves_author_once(
+        client, post_with_published_location, django_assert_num_queries):
+    from blog.relations import categories, locations
+
+    categories.load()
+    locations.load()
+    url = f'/profile/{post_with_published_location.author.username}/rss/'
+    # Автор, max(pub_date) и публикации с авторами.
+    with django_assert_num_queries(3):
+        assert client.get(url).status_code == HTTPStatus.OK, (
+            'Убедитесь, что лента автора ищет пользователя один раз.'
+        )
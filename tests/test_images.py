@@ -0,0 +1,54 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(73, 109, 137)).save(
+        buffer, format='JPEG'
+    )
+    return SimpleUploadedFile(
+        'large.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_post_image_variants(
+        mixer, user_client, user, published_category,
+        django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=make_image(1000, 500),
+        )
+    post.refresh_from_db()
+    variants = post.image_variants
+    assert variants['source'] == post.image.name
+    assert (variants['width'], variants['height']) == (1000, 500)
+    for key in ('jpeg', 'webp'):
+        assert [variant['width'] for variant in variants[key]] == [320, 640]
+        for variant in variants[key]:
+            assert default_storage.exists(variant['name'])
+            assert variant['height'] * 2 == variant['width']
+
+    content = user_client.get('/').content.decode()
+    assert post.image_srcset in content and 'image/webp' in content, (
+        'Убедитесь, что карточка публикации отдаёт копии картинки через '
+        'srcset.'
+    )
+    assert 'width="1000" height="500"' in content
+
+    old_names = [variant['name'] for variant in variants['jpeg']]
+    post.image = ''
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert not any(default_storage.exists(name) for name in old_names), (
+        'Убедитесь, что копии удаляются вместе с картинкой.'
+    )
@@ -0,0 +1,162 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+RECORDS = [
+    {'type': 'category', 'slug': 'travel', 'title': 'Путешествия',
+     'description': 'О поездках'},
+    {'type': 'location', 'name': 'Москва'},
+    {'type': 'post', 'id': 101, 'title': 'Первая', 'text': 'Текст',
+     'pub_date': '2020-01-01T10:00:00', 'author': 'writer',
+     'category': 'travel', 'location': 'Москва'},
+    {'type': 'post', 'id': 102, 'title': 'Вторая', 'text': 'Текст',
+     'pub_date': '2020-01-02T10:00:00', 'author': 'writer',
+     'category': 'missing'},
+    {'type': 'comment', 'post': 101, 'author': 'reader', 'text': 'Отлично'},
+    {'type': 'comment', 'post': 101, 'author': 'writer', 'text': 'Спасибо'},
+]
+
+
+def test_import_posts_jsonl(tmp_path):
+    from blog.models import Post
+
+    path = tmp_path / 'posts.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in RECORDS),
+        encoding='utf-8'
+    )
+    call_command('import_posts', str(path), batch_size=2)
+
+    post = Post.objects.get(pk=101)
+    assert post.author.username == 'writer'
+    assert post.category.slug == 'travel'
+    assert post.location.name == 'Москва'
+    assert post.comment_count == 2, (
+        'Убедитесь, что после импорта комментариев пересчитывается '
+        'их число у публикаций.'
+    )
+    assert not Post.objects.filter(pk=102).exists()
+    assert not path.with_name('posts.jsonl.checkpoint').exists()
+
+    call_command('import_posts', str(path))
+    assert Post.objects.count() == 1
+
+
+def test_import_posts_counts_and_dates(tmp_path):
+    from io import StringIO
+
+    from blog.models import AuthorStats, Comment, Post
+
+    records = RECORDS + [{
+        'type': 'comment', 'id': 7, 'post': 101, 'author': 'reader',
+        'text': 'Давний комментарий', 'created_at': '2020-01-03T10:00:00',
+    }]
+    path = tmp_path / 'posts.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in records),
+        encoding='utf-8'
+    )
+    output = StringIO()
+    call_command('import_posts', str(path), stdout=output)
+    assert 'Импортировано записей: 6, пропущено: 1' in output.getvalue(), (
+        'Убедитесь, что пропущенные записи не считаются импортированными.'
+    )
+    assert Comment.objects.get(pk=7).created_at.year == 2020, (
+        'Убедитесь, что импорт сохраняет дату создания комментария.'
+    )
+    assert not Comment.objects.filter(is_notified=False).exists(), (
+        'Убедитесь, что об импортированных комментариях авторам не '
+        'рассылаются уведомления.'
+    )
+    post = Post.objects.get(pk=101)
+    assert AuthorStats.objects.get(pk=post.author_id).posts_published == 1, (
+        'Убедитесь, что после импорта пересчитывается статистика.'
+    )
+    assert Post.objects.create(
+        title='Новая', text='', pub_date=post.pub_date, author=post.author
+    ).pk != post.pk
+
+
+def test_import_posts_resume(tmp_path):
+    from blog.models import Comment, Post
+
+    path = tmp_path / 'posts.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in RECORDS),
+        encoding='utf-8'
+    )
+    path.with_name('posts.jsonl.checkpoint').write_text('3')
+    call_command('import_posts', str(path), resume=True)
+    assert not Post.objects.exists()
+    assert not Comment.objects.exists()
+
+
+def test_import_posts_csv(tmp_path):
+    from blog.models import Post
+
+    path = tmp_path / 'posts.csv'
+    path.write_text(
+        'type,slug,title,description,pub_date,author,category,'
+        'is_published\n'
+        'category,news,Новости,О новостях,,,,\n'
+        'post,,Заметка,,2021-05-01T12:00:00+03:00,writer,news,false\n',
+        encoding='utf-8'
+    )
+    call_command('import_posts', str(path))
+    post = Post.objects.get(title='Заметка')
+    assert post.category.slug == 'news'
+    assert not post.is_published
+
+
+@pytest.mark.parametrize('filename', ('posts.jsonl', 'posts.csv.gz'))
+def test_export_import_round_trip(
+        tmp_path, mixer, filename, post_with_published_location):
+    from django.utils import timezone
+
+    from blog.models import Comment, Post
+
+    post = post_with_published_location
+    long_ago = timezone.now() - timedelta(days=30)
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    Post.objects.update(created_at=long_ago)
+    Comment.objects.update(created_at=long_ago)
+    fields = (
+        'id', 'title', 'pub_date', 'created_at', 'author__username',
+        'category__slug', 'location__name', 'comment_count',
+    )
+    comment_fields = ('id', 'post_id', 'author__username', 'text',
+                      'created_at')
+    expected = Post.objects.values(*fields).get()
+    expected_comments = list(
+        Comment.objects.order_by('pk').values(*comment_fields)
+    )
+    path = tmp_path / filename
+    call_command('export_posts', output=path, chunk_size=1)
+
+    Post.objects.all().delete()
+    call_command('import_posts', str(path))
+    assert Post.objects.values(*fields).get() == expected, (
+        'Убедитесь, что выгрузка export_posts загружается командой '
+        'import_posts без потерь.'
+    )
+    assert list(
+        Comment.objects.order_by('pk').values(*comment_fields)
+    ) == expected_comments, (
+        'Убедитесь, что комментарии и даты их создания переносятся '
+        'выгрузкой без потерь.'
+    )
+
+
+def test_export_posts_date_range(tmp_path, post_with_published_location):
+    post = post_with_published_location
+    path = tmp_path / 'posts.jsonl'
+    call_command(
+        'export_posts', output=path, since=post.pub_date + timedelta(days=1)
+    )
+    types = [json.loads(line)['type'] for line in path.open()]
+    assert 'post' not in types
+    assert 'category' in types
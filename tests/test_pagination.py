@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    posts, cursors = [], []
+    response = client.get(url, {'cursor': ''})
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['page_obj']
+        posts.extend(page.object_list)
+        cursors.append(page.previous_cursor)
+        if not page.has_next():
+            return posts, cursors, page
+        response = client.get(url, {'cursor': page.next_cursor})
+
+
+def test_cursor_pagination_walks_feed(
+        client, many_posts_with_published_locations):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    for url in (
+        '/',
+        f'/category/{expected[0].category.slug}/',
+        f'/profile/{expected[0].author.username}/',
+    ):
+        posts, cursors, last_page = _walk_cursor_pages(client, url)
+        assert posts == expected, (
+            'Убедитесь, что при постраничном выводе по курсору публикации '
+            f'на странице `{url}` не теряются и не повторяются.'
+        )
+        assert cursors[0] is None and all(cursors[1:]), (
+            'Убедитесь, что ссылка на предыдущую страницу есть у всех '
+            'страниц ленты, кроме первой.'
+        )
+        assert len(last_page) == len(expected) - N_PER_PAGE
+        response = client.get(url, {'cursor': last_page.previous_cursor})
+        assert list(response.context['page_obj']) == expected[:N_PER_PAGE]
+
+
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination_setting(
+        client, many_posts_with_published_locations):
+    response = client.get('/')
+    page = response.context['page_obj']
+    assert len(page) == N_PER_PAGE
+    assert page.has_next() and not page.has_previous()
+    assert f'?cursor={page.next_cursor}' in response.content.decode()
+
+
+def test_cursor_pagination_invalid_cursor(client):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_cached_post_count(
+        user_client, many_posts_with_published_locations):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get('/')
+    assert not [
+        query for query in queries if 'COUNT(' in query['sql']
+    ], 'Убедитесь, что число публикаций для пагинатора берётся из кэша.'
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    )
+
+    many_posts_with_published_locations[0].delete()
+    response = user_client.get('/')
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    ) - 1, (
+        'Убедитесь, что число публикаций пересчитывается после удаления '
+        'публикации.'
+    )
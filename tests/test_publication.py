@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+def make_due(post):
+    # Время публикации наступило без сохранения модели и сигналов.
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+
+
+def test_published_filters_on_flag_only(scheduled_post):
+    from blog.models import Post
+
+    sql = str(Post.postpub.published().query)
+    assert 'pub_date" <' not in sql and 'is_visible' in sql, (
+        'Убедитесь, что published() фильтрует только по флагу is_visible.'
+    )
+    assert not scheduled_post.is_visible
+    assert scheduled_post not in Post.postpub.published()
+
+
+def test_publish_scheduled_command(client, scheduled_post):
+    from blog.models import Post
+    from blog.publication import posts_published
+
+    events = []
+
+    def on_published(posts, **kwargs):
+        events.append(posts)
+
+    posts_published.connect(on_published)
+    try:
+        assert scheduled_post.title not in client.get('/').content.decode()
+        make_due(scheduled_post)
+        # До запуска планировщика лента стабильна и берётся из кэша.
+        assert scheduled_post.title not in client.get('/').content.decode()
+
+        call_command('publish_scheduled', '--once')
+    finally:
+        posts_published.disconnect(on_published)
+
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+    assert scheduled_post in Post.postpub.published()
+    assert events == [[(
+        scheduled_post.pk, scheduled_post.author_id,
+        scheduled_post.category_id
+    )]], 'Убедитесь, что открытие публикаций отправляет событие.'
+    assert scheduled_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что открытие публикаций сбрасывает кэш лент.'
+    )
+    call_command('publish_scheduled', '--once')
+    assert len(events) == 1
+
+
+def test_feed_does_not_publish(client, scheduled_post):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from blog.cache import POSTS_VERSION, bump_version
+
+    client.get('/')
+    make_due(scheduled_post)
+    bump_version(POSTS_VERSION)
+    with CaptureQueriesContext(connection) as queries:
+        content = client.get('/').content.decode()
+    assert scheduled_post.title not in content
+    assert not [
+        query for query in queries.captured_queries
+        if not query['sql'].startswith('SELECT')
+    ], (
+        'Убедитесь, что отложенные публикации открывает планировщик, а не '
+        'запрос на чтение ленты.'
+    )
+
+
+def test_publication_timeout(scheduled_post):
+    from blog.cache import POSTS_VERSION, bump_version
+    from blog.publication import publication_timeout
+
+    type(scheduled_post).objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() + timedelta(seconds=30)
+    )
+    assert 1 <= publication_timeout(300) <= 30, (
+        'Убедитесь, что срок кэширования лент не переживает ближайшую '
+        'отложенную публикацию.'
+    )
+
+    make_due(scheduled_post)
+    bump_version(POSTS_VERSION)
+    assert publication_timeout(300) == 300, (
+        'Убедитесь, что наступившая, но ещё не открытая публикация не '
+        'отключает кэш лент.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_future_post_schedules_publication(
+        settings, mixer, user, published_category):
+    from core.models import Task
+
+    settings.TASKS_EAGER = False
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+    task = Task.objects.get(dedup_key__startswith='publish_posts:')
+    assert task.run_at >= post.pub_date - timedelta(seconds=1), (
+        'Убедитесь, что отложенная публикация ставит задачу ко времени '
+        'своего выхода.'
+    )
+
+
+def test_refresh_visibility_recounts_stats(
+        scheduled_post, django_capture_on_commit_callbacks):
+    from blog.models import AuthorStats
+    from blog.stats import get_stats
+
+    make_due(scheduled_post)
+    with django_capture_on_commit_callbacks(execute=True):
+        scheduled_post.category.save()
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+    stats = get_stats(AuthorStats, scheduled_post.author_id)
+    assert (stats.posts_published, stats.posts_scheduled) == (1, 0), (
+        'Убедитесь, что публикации, открытые пересчётом флага видимости, '
+        'пересчитывают статистику автора.'
+    )
+
+
+def test_visibility_follows_category(post_with_published_location):
+    from blog.models import Post
+
+    post = post_with_published_location
+    category = post.category
+    assert post.is_visible
+    category.is_published = False
+    category.save()
+    assert not Post.postpub.published().filter(pk=post.pk).exists(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    category.is_published = True
+    category.save()
+    assert Post.postpub.published().filter(pk=post.pk).exists()
+
+    category.delete()
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        'Убедитесь, что публикации удалённой категории скрываются.'
+    )
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь для авторизованного клиента.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture
+def relation_caches():
+    from blog.relations import categories, locations
+
+    # Категории и местоположения читаются один раз на процесс.
+    categories.load()
+    locations.load()
+
+
+def test_post_detail_query_budget(
+        mixer, client, user_client, django_assert_max_num_queries,
+        post_with_published_location, relation_caches):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    url = f'/posts/{post.id}/'
+
+    # Публикация со связями и комментарии с авторами.
+    with django_assert_max_num_queries(2):
+        assert client.get(url).status_code == HTTPStatus.OK
+    with django_assert_max_num_queries(AUTH_QUERIES + 2):
+        assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_post_detail_hidden_post_single_query(
+        client, user_client, django_assert_max_num_queries,
+        post_with_published_location, relation_caches):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+
+    with django_assert_max_num_queries(1):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_feed_queries_use_indexes(post_with_published_location, mixer):
+    from django.core.management import call_command
+
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    call_command('explain_feeds')
+
+
+def test_profile_query_budget(
+        mixer, user, another_user_client, django_assert_max_num_queries,
+        many_posts_with_published_locations):
+    for post in many_posts_with_published_locations[:3]:
+        mixer.blend('blog.Comment', post=post)
+    url = f'/profile/{user.username}/'
+    another_user_client.get(url)
+
+    # Автор и публикации со связями; число публикаций уже в кэше.
+    with django_assert_max_num_queries(AUTH_QUERIES + 2):
+        response = another_user_client.get(url)
+    assert response.context['profile'] == user
+
+
+def test_category_query_budget(
+        mixer, user_client, published_category,
+        django_assert_max_num_queries, many_posts_with_published_locations):
+    for post in many_posts_with_published_locations[:3]:
+        mixer.blend('blog.Comment', post=post)
+    url = f'/category/{published_category.slug}/'
+    user_client.get(url)
+
+    # Категория и число публикаций берутся из кэша.
+    with django_assert_max_num_queries(AUTH_QUERIES + 1):
+        response = user_client.get(url)
+    assert response.context['category'] == published_category
+
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что снятая с публикации категория сразу перестаёт '
+        'открываться.'
+    )
+
+
+def test_feed_relations_from_process_cache(
+        user_client, post_with_published_location):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get('/')
+    post_queries = [
+        query['sql'] for query in queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+    assert post_queries and not any(
+        'JOIN "blog_category"' in sql or 'JOIN "blog_location"' in sql
+        for sql in post_queries
+    ), (
+        'Убедитесь, что лента берёт категории и местоположения из кэша, '
+        'а не присоединяет их в запросе публикаций.'
+    )
+
+    location = post.location
+    location.name = 'Переименованное местоположение'
+    location.save()
+    assert location.name in user_client.get('/').content.decode(), (
+        'Убедитесь, что кэш местоположений сбрасывается после их изменения.'
+    )
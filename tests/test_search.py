@@ -0,0 +1,128 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        return mixer.blend(
+            'blog.Post', title=title, text=text, author=user,
+            category=published_category, **kwargs
+        )
+
+    return {
+        'title': blend('Путешествие на Байкал', 'Заметки о поездке.'),
+        'text': blend('Заметки', 'Зимой мы ездили на Байкал.'),
+        'hidden': blend(
+            'Байкал летом', 'Черновик.', is_published=False
+        ),
+        'other': blend('Горы Алтая', 'Про другое.'),
+    }
+
+
+def search(query):
+    from blog.models import Post
+
+    return list(Post.postpub.published_cached().search(query))
+
+
+@pytest.mark.parametrize('fts', (True, False), ids=('fts5', 'inverted'))
+def test_post_search(search_posts, monkeypatch, fts):
+    from blog import search as search_module
+
+    if not fts:
+        monkeypatch.setattr(
+            search_module, 'fts_available', lambda connection: False
+        )
+        search_module.search_index.rebuild()
+    posts = search_posts
+
+    assert search('байкал') == [posts['title'], posts['text']], (
+        'Убедитесь, что поиск находит опубликованные посты и ставит '
+        'совпадения в заголовке выше.'
+    )
+    assert search('байк') == [posts['title'], posts['text']], (
+        'Убедитесь, что поиск находит недописанные слова.'
+    )
+    assert search('зимой байкал') == [posts['text']]
+    assert search('') == [] and search('"*') == []
+
+    post = posts['other']
+    post.text = 'Потом был Байкал.'
+    post.save()
+    assert post in search('байкал'), (
+        'Убедитесь, что поисковый индекс обновляется при изменении поста.'
+    )
+    post.delete()
+    assert post not in search('байкал')
+
+
+def test_search_view(client, search_posts):
+    response = client.get('/search/', {'q': 'Байкал'})
+    assert list(response.context['page_obj']) == [
+        search_posts['title'], search_posts['text']
+    ]
+
+
+def test_rebuild_search_index(search_posts):
+    from blog.search import FTS_TABLE
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    assert search('байкал') == []
+    call_command('rebuild_search_index')
+    assert search('байкал') == [search_posts['title'], search_posts['text']]
+
+
+@pytest.mark.parametrize('fts', (True, False), ids=('fts5', 'inverted'))
+def test_search_limit_applies_to_visible_posts(
+        search_posts, mixer, monkeypatch, fts):
+    from blog import search as search_module
+
+    if not fts:
+        monkeypatch.setattr(
+            search_module, 'fts_available', lambda connection: False
+        )
+        search_module.search_index.rebuild()
+    # Скрытый пост релевантнее всех видимых.
+    mixer.blend(
+        'blog.Post', title='Байкал', text='Байкал, Байкал и Байкал.',
+        is_published=False
+    )
+    monkeypatch.setattr(search_module, 'SEARCH_RESULTS_LIMIT', 1)
+    assert search('байкал') == [search_posts['title']], (
+        'Убедитесь, что ограничение числа результатов применяется к '
+        'видимым публикациям, а не ко всем совпадениям.'
+    )
+
+
+def test_inverted_index_applies_changes_incrementally(
+        search_posts, monkeypatch, django_capture_on_commit_callbacks):
+    from blog import search as search_module
+
+    monkeypatch.setattr(
+        search_module, 'fts_available', lambda connection: False
+    )
+    # Индекс другого процесса того же сервера.
+    other = search_module.InvertedIndex()
+    other.load()
+    version = other._version
+    loaded = []
+    rows = other._rows
+    monkeypatch.setattr(
+        other, '_rows', lambda post_ids=None: loaded.append(post_ids)
+        or rows(post_ids)
+    )
+
+    post = search_posts['other']
+    post.title = 'Снова Байкал'
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert post.pk in other.search(['байкал'])
+    assert other._version == version and loaded == [{post.pk}], (
+        'Убедитесь, что другие процессы перечитывают только изменённую '
+        'публикацию, а не весь индекс.'
+    )
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_stats(obj):
+    from blog.models import AuthorStats, CategoryStats, User
+    from blog.stats import get_stats
+
+    model = AuthorStats if isinstance(obj, User) else CategoryStats
+    return get_stats(model, obj.pk)
+
+
+def test_stats_follow_posts_and_comments(
+        mixer, user, another_user, published_category,
+        django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category
+        )
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            pub_date=timezone.now() + timedelta(days=1)
+        )
+        mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+
+    for obj in (user, published_category):
+        stats = get_stats(obj)
+        assert (
+            stats.posts_published, stats.posts_scheduled,
+            stats.comments_received
+        ) == (1, 1, 2), (
+            'Убедитесь, что статистика автора и категории обновляется при '
+            'добавлении публикаций и комментариев.'
+        )
+    assert get_stats(another_user).last_activity is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.comments.first().delete()
+        post.is_published = False
+        post.save()
+    stats = get_stats(user)
+    assert (stats.posts_published, stats.comments_received) == (0, 1)
+
+
+def test_stats_in_context(
+        client, mixer, user, published_category, django_assert_num_queries,
+        django_capture_on_commit_callbacks):
+    # Статистика пересчитывается после фиксации записи, а не при чтении.
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend('blog.Post', author=user, category=published_category)
+    url = f'/category/{published_category.slug}/'
+    assert client.get(url).context['stats'].posts_published == 1
+    response = client.get(f'/profile/{user.username}/')
+    assert response.context['stats'].posts_published == 1
+
+    from blog.models import AuthorStats
+    from blog.stats import get_stats
+
+    with django_assert_num_queries(0):
+        get_stats(AuthorStats, user.pk)
+
+
+def test_rebuild_stats(user, post_with_published_location):
+    from blog.models import AuthorStats
+
+    AuthorStats.objects.all().delete()
+    call_command('rebuild_stats')
+    assert AuthorStats.objects.get(pk=user.pk).posts_published == 1
+
+
+def test_stats_reads_never_write(
+        user, post_with_published_location, django_assert_num_queries):
+    from blog.models import AuthorStats
+    from blog.stats import get_stats
+
+    # Без строки статистики чтение не пересчитывает её.
+    with django_assert_num_queries(1):
+        assert get_stats(AuthorStats, user.pk).posts_published == 0
+    assert not AuthorStats.objects.exists()
+
+
+def test_stats_backfill_migration(
+        user, another_user, post_with_published_location):
+    from importlib import import_module
+
+    from django.apps import apps
+
+    from blog.models import AuthorStats, CategoryStats
+
+    migration = import_module('blog.migrations.0013_backfill_stats')
+    migration.backfill_stats(apps, None)
+    post = post_with_published_location
+    assert AuthorStats.objects.get(pk=user.pk).posts_published == 1, (
+        'Убедитесь, что миграция заполняет статистику авторов.'
+    )
+    assert AuthorStats.objects.get(pk=another_user.pk).posts_published == 0
+    assert CategoryStats.objects.get(pk=post.category_id).posts_published == 1
+
+
+def test_category_unpublish_recounts_authors(
+        user, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    category = post_with_published_location.category
+    with django_capture_on_commit_callbacks(execute=True):
+        category.is_published = False
+        category.save()
+    assert get_stats(user).posts_published == 0, (
+        'Убедитесь, что снятие категории с публикации пересчитывает '
+        'статистику её авторов.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        category.is_published = True
+        category.save()
+    assert get_stats(user).posts_published == 1
+
+
+def test_stats_count_visible_posts(
+        user, published_category, mixer, django_capture_on_commit_callbacks):
+    from blog.models import Post
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, pub_date=timezone.now() + timedelta(days=1)
+        )
+    with django_capture_on_commit_callbacks(execute=True):
+        # Время наступило, но планировщик публикацию ещё не открыл.
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(minutes=1)
+        )
+        call_command('rebuild_stats', stdout=StringIO())
+    stats = get_stats(user)
+    assert (stats.posts_published, stats.posts_scheduled) == (0, 1), (
+        'Убедитесь, что статистика считает опубликованными только '
+        'публикации, видимые в лентах.'
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('publish_scheduled', '--once', stdout=StringIO())
+    stats = get_stats(user)
+    assert (stats.posts_published, stats.posts_scheduled) == (1, 0)
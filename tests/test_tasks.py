@@ -0,0 +1,110 @@
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+# Задачи выполняются в потоках обработчика со своими соединениями.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@override_settings(TASKS_EAGER=False)
+def test_post_image_task_queue(mixer, user, published_category):
+    from blog.tasks import process_post_image
+    from core.models import Task
+    from core.tasks import enqueue
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category, image=''
+    )
+    for _ in range(2):
+        enqueue(
+            process_post_image, post.pk, dedup_key=f'post_image:{post.pk}'
+        )
+    assert Task.objects.filter(status=Task.PENDING).count() == 1, (
+        'Убедитесь, что одинаковая задача не ставится в очередь дважды.'
+    )
+
+    call_command('run_tasks', once=True, workers=2)
+    assert Task.objects.get().status == Task.DONE
+
+
+@override_settings(TASKS_EAGER=False, TASK_MAX_ATTEMPTS=2)
+def test_failed_task_retries():
+    from django.utils import timezone
+
+    from core.models import Task
+    from core.tasks import enqueue
+
+    task = enqueue(int, 'не число')
+    call_command('run_tasks', once=True)
+    task.refresh_from_db()
+    assert task.status == Task.PENDING and task.attempts == 1
+    assert task.run_at > timezone.now() and 'ValueError' in task.last_error, (
+        'Убедитесь, что упавшая задача повторяется позже.'
+    )
+
+    Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+    call_command('run_tasks', once=True)
+    task.refresh_from_db()
+    assert task.status == Task.FAILED and task.attempts == 2
+
+
+def failing_digest():
+    raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(TASKS_EAGER=False)
+def test_retry_merges_into_pending_duplicate():
+    from core.models import Task
+    from core.tasks import claim_tasks, enqueue, run_task
+
+    enqueue(failing_digest, dedup_key='digest')
+    task, = claim_tasks(1)
+    # Пока задача выполняется, такая же снова ставится в очередь.
+    duplicate = enqueue(failing_digest, dedup_key='digest')
+
+    run_task(task)
+    task.refresh_from_db()
+    assert task.status == Task.DONE and 'SMTP' in task.last_error, (
+        'Убедитесь, что повтор задачи с ожидающим дубликатом не нарушает '
+        'уникальность, а сливается с ним.'
+    )
+    duplicate.refresh_from_db()
+    assert duplicate.status == Task.PENDING
+
+
+@override_settings(TASKS_EAGER=False, TASK_LOCK_TIMEOUT=0)
+def test_requeue_skips_pending_duplicates():
+    from core.models import Task
+    from core.tasks import claim_tasks, enqueue, requeue_stale_tasks
+
+    enqueue(failing_digest, dedup_key='digest')
+    enqueue(failing_digest)
+    stale, plain = claim_tasks(2)
+    duplicate = enqueue(failing_digest, dedup_key='digest')
+
+    assert requeue_stale_tasks() == 1
+    stale.refresh_from_db()
+    plain.refresh_from_db()
+    assert stale.status == Task.DONE and plain.status == Task.PENDING, (
+        'Убедитесь, что зависшая задача с ожидающим дубликатом не '
+        'возвращается в очередь.'
+    )
+    assert Task.objects.filter(status=Task.PENDING).count() == 2
+    duplicate.refresh_from_db()
+    assert duplicate.status == Task.PENDING
+
+
+def test_eager_mode_keeps_delayed_tasks(
+        mixer, another_user, post_with_published_location):
+    from core.models import Task
+
+    mixer.cycle(2).blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user
+    )
+    assert Task.objects.filter(
+        dedup_key='comment_digest', status=Task.PENDING
+    ).count() == 1, (
+        'Убедитесь, что отложенные задачи ждут своего времени в очереди '
+        'и при TASKS_EAGER.'
+    )